@@ -27,16 +27,20 @@ class FileHandle(object):
         self.close()
 
     def open(self):
+        # Reuse the file we already opened rather than looking up the path again,
+        # since this gets called on every access to the `file` property.
+        if self._file is not None:
+            return
+
         if not os.path.exists(self.filename):
             raise FileNotFoundError(f"Could not find {self.filename}")
 
-        if self._file is None:
-            try:
-                self._file = h5py.File(self.filename, "r")
-                self._is_hdf5 = True
-            except OSError as e:
-                # We get OSError when trying to read non-HDF5 file with h5py
-                pass
+        try:
+            self._file = h5py.File(self.filename, "r")
+            self._is_hdf5 = True
+        except OSError as e:
+            # We get OSError when trying to read non-HDF5 file with h5py
+            pass
 
         if self._file is None:
             self._file = open(self.filename, "r")
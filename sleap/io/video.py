@@ -1,5 +1,6 @@
 """ Video reading and writing interfaces for different formats. """
 
+import errno
 import os
 import shutil
 
@@ -103,9 +104,14 @@ class HDF5Video:
             try:
                 self.__file_h5 = h5.File(self.filename, "r")
             except OSError as ex:
-                raise FileNotFoundError(
-                    f"Could not find HDF5 file {self.filename}"
-                ) from ex
+                # Only report missing files as such and let other errors through.
+                if ex.errno in (errno.ENOENT, errno.ENOTDIR) or not os.path.exists(
+                    self.filename
+                ):
+                    raise FileNotFoundError(
+                        f"Could not find HDF5 file {self.filename}"
+                    ) from ex
+                raise
         else:
             self.__file_h5 = None
 
@@ -481,9 +487,14 @@ class NumpyVideo:
             try:
                 self.__data = np.load(self.filename)
             except OSError as ex:
-                raise FileNotFoundError(
-                    f"Could not find filename {self.filename}"
-                ) from ex
+                # Only report missing files as such and let other errors through.
+                if ex.errno in (errno.ENOENT, errno.ENOTDIR) or not os.path.exists(
+                    self.filename
+                ):
+                    raise FileNotFoundError(
+                        f"Could not find filename {self.filename}"
+                    ) from ex
+                raise
         else:
             self.__data = None
 
@@ -751,9 +762,22 @@ class SingleImageVideo:
 
         self.__data = dict()
         self.test_frame_ = None
+        self._resolved_filenames = dict()
 
     def _load_idx(self, idx):
-        img = cv2.imread(self._get_filename(idx))
+        filename = self._get_filename(idx)
+        img = cv2.imread(filename)
+
+        if img is None and not os.path.exists(filename):
+            # The file was moved or deleted after its location was cached, so forget it
+            # and look it up again. This raises FileNotFoundError if it is gone.
+            self._resolved_filenames.pop((self.filename, self.filenames[idx]), None)
+            filename = self._get_filename(idx)
+            img = cv2.imread(filename)
+
+        if img is None:
+            # The file exists but could not be decoded.
+            raise IOError(f"Unable to read image file {idx}: {filename}")
 
         if img.shape[2] == 3:
             # OpenCV channels are in BGR order, so we should convert to RGB
@@ -762,14 +786,24 @@ class SingleImageVideo:
 
     def _get_filename(self, idx: int) -> str:
         f = self.filenames[idx]
+
+        # Reuse the location found on a previous lookup so missing paths are only
+        # checked once per image. The lookup depends on the "video" file, so it
+        # is part of the key.
+        key = (self.filename, f)
+        if key in self._resolved_filenames:
+            return self._resolved_filenames[key]
+
         if os.path.exists(f):
+            self._resolved_filenames[key] = f
             return f
 
         # Try the directory from the "video" file (this works if all the images
         # are in the same directory with distinctive filenames).
-        f = os.path.join(os.path.dirname(self.filename), os.path.basename(f))
-        if os.path.exists(f):
-            return f
+        resolved = os.path.join(os.path.dirname(self.filename), os.path.basename(f))
+        if os.path.exists(resolved):
+            self._resolved_filenames[key] = resolved
+            return resolved
 
         raise FileNotFoundError(f"Unable to locate file {idx}: {self.filenames[idx]}")
 
@@ -1414,13 +1448,15 @@ class Video:
             return path
 
         # Strip the directory and lets see if the file is in the current working
-        # directory.
-        elif os.path.exists(os.path.basename(path)):
-            return os.path.basename(path)
+        # directory. This is skipped if the path had no directory to strip since we
+        # already know it doesn't exist.
+        basename = os.path.basename(path)
+        if basename != path and os.path.exists(basename):
+            return basename
 
         # Special case: this is an ImgStore path! We cant use
         # basename because it will strip the directory name off
-        elif path.endswith("metadata.yaml"):
+        if path.endswith("metadata.yaml"):
 
             # Get the parent dir of the YAML file.
             img_store_dir = os.path.basename(os.path.split(path)[0])
@@ -10,12 +10,281 @@ if hasattr(numpy.random, "_bit_generator"):
 import numpy as np
 import tensorflow as tf
 import attr
-from typing import List, Text
+from typing import List, Optional, Text
 import imgaug as ia
 import imgaug.augmenters as iaa
 from sleap.nn.config import AugmentationConfig
 
 
+def make_affine_matrix(
+    rotation: tf.Tensor, scale: tf.Tensor, translation: tf.Tensor, center: tf.Tensor
+) -> tf.Tensor:
+    """Build a 2D affine transformation matrix.
+
+    Args:
+        rotation: Scalar tf.float32 rotation angle in degrees. Positive angles rotate
+            clockwise in image coordinates (i.e., with the y-axis pointing down).
+        scale: Scalar tf.float32 scaling factor.
+        translation: Tensor of shape (2,) and dtype tf.float32 specifying the (dx, dy)
+            translation in pixels. This is applied after rotation and before scaling.
+        center: Tensor of shape (2,) and dtype tf.float32 specifying the (x, y)
+            coordinates of the center of rotation and scaling.
+
+    Returns:
+        A tf.float32 tensor of shape (3, 3) that maps homogeneous (x, y, 1) coordinates
+        in the input image to the output image.
+
+    Notes:
+        Points are transformed as:
+            xy_out = scale * (R(rotation) @ (xy_in - center) + translation) + center
+
+        This is equivalent to applying rotation, translation and scaling in sequence
+        as in the `ImgaugAugmenter` stack.
+    """
+    theta = tf.cast(rotation, tf.float32) * (np.pi / 180.0)
+    a = tf.cos(theta) * scale
+    b = tf.sin(theta) * scale
+    cx, cy = center[0], center[1]
+    tx = cx - a * cx + b * cy + scale * translation[0]
+    ty = cy - b * cx - a * cy + scale * translation[1]
+    zero = tf.zeros_like(a)
+    one = tf.ones_like(a)
+    return tf.reshape(tf.stack([a, -b, tx, b, a, ty, zero, zero, one]), [3, 3])
+
+
+def transform_image(image: tf.Tensor, matrix: tf.Tensor) -> tf.Tensor:
+    """Apply an affine transformation to an image.
+
+    Args:
+        image: Tensor of shape (height, width, channels) of a single image.
+        matrix: A tf.float32 tensor of shape (3, 3) that maps input image coordinates
+            to output image coordinates. This can be generated by `make_affine_matrix`.
+
+    Returns:
+        The transformed image of the same shape and dtype as the input. Pixels that are
+        mapped from outside of the input image will be set to 0.
+
+        Pixel values are sampled with bilinear interpolation.
+    """
+    # The op samples output pixels from input coordinates, so we need the inverse.
+    inverse_matrix = tf.linalg.inv(matrix)
+    transforms = tf.reshape(inverse_matrix, [1, 9])[:, :8]
+    transformed_image = tf.raw_ops.ImageProjectiveTransformV2(
+        images=tf.expand_dims(image, axis=0),
+        transforms=transforms,
+        output_shape=tf.shape(image)[:2],
+        interpolation="BILINEAR",
+    )
+    return tf.squeeze(transformed_image, axis=0)
+
+
+def transform_points(points: tf.Tensor, matrix: tf.Tensor) -> tf.Tensor:
+    """Apply an affine transformation to a set of points.
+
+    Args:
+        points: A tf.float32 tensor of shape (..., 2) where the last axis corresponds to
+            (x, y) pixel coordinates on the image. These can contain NaNs to indicate
+            missing points.
+        matrix: A tf.float32 tensor of shape (3, 3) that maps input image coordinates
+            to output image coordinates. This can be generated by `make_affine_matrix`.
+
+    Returns:
+        The transformed points of the same shape as the input. Missing points will
+        remain NaNs.
+    """
+    return tf.tensordot(points, tf.transpose(matrix[:2, :2]), axes=1) + matrix[:2, 2]
+
+
+def adjust_image_values(
+    image: tf.Tensor,
+    offset: Optional[tf.Tensor] = None,
+    gamma: Optional[tf.Tensor] = None,
+) -> tf.Tensor:
+    """Apply additive and gamma intensity adjustments to an image.
+
+    Args:
+        image: Tensor of any shape and dtype.
+        offset: Values to add to the image. This must be broadcastable to the shape of
+            the image, e.g., a scalar for brightness or a per-pixel tensor for noise.
+            No offset is added if not provided.
+        gamma: Scalar gamma for contrast adjustment. The image is rescaled as
+            `max_val * (x / max_val) ** gamma`, where `max_val` is the maximum value of
+            the dtype if integer, or 1.0 if floating point. No contrast adjustment is
+            applied if not provided.
+
+    Returns:
+        The adjusted image of the same shape and dtype as the input. If the input was
+        of an integer type, values are clipped to the range of the dtype after each
+        adjustment and rounded to the nearest integer.
+
+    Notes:
+        The offset is added before the gamma adjustment. To match the order used by
+        `ImgaugAugmenter`, call this function once per adjustment.
+    """
+    adjusted_image = tf.cast(image, tf.float32)
+
+    def clip(x):
+        if image.dtype.is_integer:
+            return tf.clip_by_value(x, image.dtype.min, image.dtype.max)
+        return x
+
+    if offset is not None:
+        adjusted_image = clip(adjusted_image + offset)
+    if gamma is not None:
+        max_val = image.dtype.max if image.dtype.is_integer else 1.0
+        adjusted_image = clip(
+            max_val * tf.pow(tf.maximum(adjusted_image / max_val, 0.0), gamma)
+        )
+    if image.dtype.is_integer:
+        adjusted_image = tf.round(adjusted_image)
+    return tf.cast(adjusted_image, image.dtype)
+
+
+@attr.s(auto_attribs=True)
+class TensorFlowAugmenter:
+    """Data transformer that applies augmentations with native TensorFlow ops.
+
+    This is functionally similar to `ImgaugAugmenter` with a stack built from the same
+    configuration, but the transformations are implemented entirely in TensorFlow, so
+    the mapping can run in parallel without the overhead of calling into Python for
+    each element.
+
+    Attributes:
+        config: An `AugmentationConfig` instance with the augmentation parameters.
+    """
+
+    config: AugmentationConfig = attr.ib(factory=AugmentationConfig)
+
+    @classmethod
+    def from_config(cls, config: AugmentationConfig) -> "TensorFlowAugmenter":
+        """Create an augmenter from a set of configuration parameters.
+
+        Args:
+            config: An `AugmentationConfig` instance with the desired parameters.
+
+        Returns:
+            An instance of this class with the specified augmentation configuration.
+        """
+        return cls(config=config)
+
+    @property
+    def input_keys(self) -> List[Text]:
+        """Return the keys that incoming elements are expected to have."""
+        return ["image", "instances"]
+
+    @property
+    def output_keys(self) -> List[Text]:
+        """Return the keys that outgoing elements will have."""
+        return self.input_keys
+
+    def transform_dataset(self, input_ds: tf.data.Dataset) -> tf.data.Dataset:
+        """Create a `tf.data.Dataset` with elements containing augmented data.
+
+        Args:
+            input_ds: A dataset with elements that contain the keys "image" and
+                "instances". This is typically raw data from a data provider.
+
+        Returns:
+            A `tf.data.Dataset` with the same keys as the input, but with images and
+            instance points updated with the applied augmentations.
+
+        Notes:
+            The "scale" key in examples are not modified when scaling augmentation is
+            applied.
+
+            Geometric transformations are applied about the center of the image, and
+            intensity adjustments are applied in the value range of the image dtype.
+        """
+        config = self.config
+        geometric = config.rotate or config.translate or config.scale
+        intensity = (
+            config.uniform_noise
+            or config.gaussian_noise
+            or config.contrast
+            or config.brightness
+        )
+        if not (geometric or intensity):
+            return input_ds
+
+        def augment(frame_data):
+            """Local processing function for dataset mapping."""
+            image = frame_data["image"]
+            instances = frame_data["instances"]
+
+            if geometric:
+                rotation = 0.0
+                if config.rotate:
+                    rotation = tf.random.uniform(
+                        [], config.rotation_min_angle, config.rotation_max_angle
+                    )
+                translation = tf.zeros([2], tf.float32)
+                if config.translate:
+                    # Sample integer offsets uniformly over the closed range.
+                    translation = tf.cast(
+                        tf.random.uniform(
+                            [2],
+                            config.translate_min,
+                            config.translate_max + 1,
+                            dtype=tf.int32,
+                        ),
+                        tf.float32,
+                    )
+                scale = 1.0
+                if config.scale:
+                    scale = tf.random.uniform([], config.scale_min, config.scale_max)
+
+                image_size = tf.cast(tf.shape(image)[:2], tf.float32)
+                center = (tf.reverse(image_size, [0]) - 1) / 2
+                matrix = make_affine_matrix(
+                    rotation=rotation,
+                    scale=scale,
+                    translation=translation,
+                    center=center,
+                )
+                image = transform_image(image, matrix)
+                instances = transform_points(instances, matrix)
+
+            if intensity:
+                # Adjustments are applied one at a time in the same order as the
+                # imgaug stack, clipping and rounding to the image dtype after each.
+                # Noise is shared across channels as in imgaug (per_channel=False).
+                noise_shape = tf.concat([tf.shape(image)[:2], [1]], axis=0)
+                if config.uniform_noise:
+                    noise = tf.random.uniform(
+                        noise_shape,
+                        config.uniform_noise_min_val,
+                        config.uniform_noise_max_val,
+                    )
+                    image = adjust_image_values(image, offset=noise)
+                if config.gaussian_noise:
+                    noise = tf.random.normal(
+                        noise_shape,
+                        mean=config.gaussian_noise_mean,
+                        stddev=config.gaussian_noise_stddev,
+                    )
+                    image = adjust_image_values(image, offset=noise)
+                if config.contrast:
+                    gamma = tf.random.uniform(
+                        [], config.contrast_min_gamma, config.contrast_max_gamma
+                    )
+                    image = adjust_image_values(image, gamma=gamma)
+                if config.brightness:
+                    brightness = tf.random.uniform(
+                        [], config.brightness_min_val, config.brightness_max_val
+                    )
+                    image = adjust_image_values(image, offset=brightness)
+
+            frame_data.update({"image": image, "instances": instances})
+            return frame_data
+
+        # Apply the augmentation to each element.
+        output_ds = input_ds.map(
+            augment, num_parallel_calls=tf.data.experimental.AUTOTUNE
+        )
+
+        return output_ds
+
+
 @attr.s(auto_attribs=True)
 class ImgaugAugmenter:
     """Data transformer based on the `imgaug` library.
@@ -112,36 +381,23 @@ class ImgaugAugmenter:
         # Define augmentation function to map over each sample.
         def py_augment(image, instances):
             """Local processing function that will not be autographed."""
-            # Ensure that the transformations applied to all data within this
-            # example are kept consistent.
-            aug_det = self.augmenter.to_deterministic()
-
-            # Augment the image.
-            aug_img = aug_det.augment_image(image.numpy())
-
-            # Augment each set of points for each instance.
-            aug_instances = []
-            for instance in instances:
-                kps = ia.KeypointsOnImage.from_xy_array(
-                    instance.numpy(), tuple(image.shape)
-                )
-                aug_instance = aug_det.augment_keypoints(kps).to_xy_array()
-                aug_instances.append(aug_instance)
-
-            # Convert the results to tensors.
-            # aug_img = tf.convert_to_tensor(aug_img, dtype=image.dtype)
+            # Augment the image and the points of all instances in a single call so
+            # that the same transformation is applied to all data within this example.
+            kps = ia.KeypointsOnImage.from_xy_array(
+                instances.reshape(-1, 2), image.shape
+            )
+            aug_img, aug_kps = self.augmenter.augment(image=image, keypoints=kps)
 
             # This will get converted to a rank 3 tensor (n_instances, n_nodes, 2).
-            aug_instances = np.stack(aug_instances, axis=0)
-            # aug_instances = [
-            #     tf.convert_to_tensor(x, dtype=instances.dtype) for x in aug_instances
-            # ]
+            aug_instances = (
+                aug_kps.to_xy_array().reshape(instances.shape).astype(instances.dtype)
+            )
 
             return aug_img, aug_instances
 
         def augment(frame_data):
             """Wrap local processing function for dataset mapping."""
-            image, instances = tf.py_function(
+            image, instances = tf.numpy_function(
                 py_augment,
                 [frame_data["image"], frame_data["instances"]],
                 [frame_data["image"].dtype, frame_data["instances"].dtype],
@@ -153,6 +409,7 @@ class ImgaugAugmenter:
 
         # Apply the augmentation to each element.
         # Note: We map sequentially since imgaug gets slower with tf.data parallelism.
+        # Use `TensorFlowAugmenter` for augmentation that runs in parallel in-graph.
         output_ds = input_ds.map(augment)
 
         return output_ds
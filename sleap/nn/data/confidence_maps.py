@@ -3,18 +3,23 @@
 import tensorflow as tf
 import attr
 from typing import List, Text
-from sleap.nn.data.utils import make_grid_vectors
+from sleap.nn.data.utils import make_grid_vectors, get_image_size
 
 
 def make_confmaps(
-    points: tf.Tensor, xv: tf.Tensor, yv: tf.Tensor, sigma: float
+    points: tf.Tensor,
+    xv: tf.Tensor,
+    yv: tf.Tensor,
+    sigma: float,
+    dtype: tf.DType = tf.float32,
 ) -> tf.Tensor:
     """Make confidence maps from a set of points from a single instance.
 
     Args:
-        points: A tensor of points of shape (n_nodes, 2) and dtype tf.float32 where the
-            last axis corresponds to (x, y) pixel coordinates on the image. These can
-            contain NaNs to indicate missing points.
+        points: A tensor of points of shape (..., n_nodes, 2) and dtype tf.float32 where
+            the last axis corresponds to (x, y) pixel coordinates on the image. These
+            can contain NaNs to indicate missing points. Any leading dimensions (e.g.,
+            instances) will be broadcast over.
         xv: Sampling grid vector for x-coordinates of shape (grid_width,) and dtype
             tf.float32. This can be generated by
             `sleap.nn.data.utils.make_grid_vectors`.
@@ -23,10 +28,13 @@ def make_confmaps(
             `sleap.nn.data.utils.make_grid_vectors`.
         sigma: Standard deviation of the 2D Gaussian distribution sampled to generate
             confidence maps.
+        dtype: Floating point dtype to evaluate and return the confidence maps in.
+            Distances are always computed in tf.float32, but setting this to
+            tf.bfloat16 or tf.float16 halves the memory used by the full size maps.
 
     Returns:
-        Confidence maps as a tensor of shape (grid_height, grid_width, n_nodes) of dtype
-        tf.float32.
+        Confidence maps as a tensor of shape (..., grid_height, grid_width, n_nodes) of
+        dtype `dtype`.
 
         Each channel of the confidence maps will contain the unnormalized PDF of a 2D
         Gaussian distribution with a mean centered at the coordinates of the
@@ -39,20 +47,39 @@ def make_confmaps(
         If a point was missing (indicated by NaNs), the corresponding channel will
         contain all zeros.
 
+    Notes:
+        The isotropic 2D Gaussian is separable, so it is computed as the outer product
+        of 1D Gaussians along each axis. This evaluates (grid_height + grid_width)
+        exponentials per point instead of grid_height * grid_width.
+
+        Missing points are masked out on the 1D Gaussians along the x-axis, so no pass
+        over the full size confidence maps is needed to remove NaNs.
+
     See also: sleap.nn.data.make_grid_vectors, make_multi_confmaps
     """
-    x = tf.reshape(tf.gather(points, [0], axis=1), [1, 1, -1])
-    y = tf.reshape(tf.gather(points, [1], axis=1), [1, 1, -1])
-    cm = tf.exp(
-        -((tf.reshape(xv, [1, -1, 1]) - x) ** 2 + (tf.reshape(yv, [-1, 1, 1]) - y) ** 2)
-        / (2 * sigma ** 2)
+    # Replace missing points with a placeholder and keep track of them as a mask.
+    valid = tf.reduce_all(tf.math.is_finite(points), axis=-1)  # (..., n)
+    points = tf.where(tf.expand_dims(valid, axis=-1), points, 0.0)
+    valid = tf.expand_dims(tf.expand_dims(valid, axis=-2), axis=-2)  # (..., 1, 1, n)
+
+    x = tf.expand_dims(tf.expand_dims(points[..., 0], axis=-2), axis=-2)
+    y = tf.expand_dims(tf.expand_dims(points[..., 1], axis=-2), axis=-2)
+    gx = tf.exp(
+        tf.cast(-((tf.reshape(xv, [-1, 1]) - x) ** 2) / (2 * sigma ** 2), dtype)
+    ) * tf.cast(valid, dtype)
+    gy = tf.exp(
+        tf.cast(-((tf.reshape(yv, [-1, 1, 1]) - y) ** 2) / (2 * sigma ** 2), dtype)
     )
-    cm = tf.math.maximum(0.0, cm)  # Replaces NaNs with 0.
+    cm = gy * gx  # (..., grid_height, 1, n) * (..., 1, grid_width, n)
     return cm
 
 
 def make_multi_confmaps(
-    instances: tf.Tensor, xv: tf.Tensor, yv: tf.Tensor, sigma: float
+    instances: tf.Tensor,
+    xv: tf.Tensor,
+    yv: tf.Tensor,
+    sigma: float,
+    dtype: tf.DType = tf.float32,
 ) -> tf.Tensor:
     """Make confidence maps for multiple instances through max reduction.
 
@@ -69,6 +96,8 @@ def make_multi_confmaps(
             `sleap.nn.data.utils.make_grid_vectors`.
         sigma: Standard deviation of the 2D Gaussian distribution sampled to generate
             confidence maps.
+        dtype: Floating point dtype to evaluate the per-instance confidence maps and
+            the max reduction in. The reduced output is always cast to tf.float32.
 
     Returns:
         Confidence maps as a tensor of shape (grid_height, grid_width, n_nodes) of dtype
@@ -78,20 +107,19 @@ def make_multi_confmaps(
         generated from all individual points for the associated node.
 
     Notes:
-        The confidence maps are for each instance are computed individually and
-        immediately max-reduced to avoid maintaining the entire set of all instance
-        confidence maps. This enables memory-efficient generation of multi-instance
-        confidence maps for examples with large numbers of instances.
+        The confidence maps for all instances are computed in a single vectorized
+        operation and then max-reduced across instances. This avoids a sequential loop
+        over instances at the cost of temporarily storing a tensor of shape
+        (n_instances, grid_height, grid_width, n_nodes).
 
     See also: sleap.nn.data.make_grid_vectors, make_confmaps
     """
-    grid_height = tf.shape(yv)[0]
-    grid_width = tf.shape(xv)[0]
-    n_nodes = tf.shape(instances)[1]
-    cms = tf.zeros((grid_height, grid_width, n_nodes), tf.float32)
-    for points in instances:
-        cms = tf.maximum(cms, make_confmaps(points, xv=xv, yv=yv, sigma=sigma))
-    return cms
+    cms = make_confmaps(instances, xv=xv, yv=yv, sigma=sigma, dtype=dtype)
+
+    # Clip at 0 so that frames without instances produce empty confidence maps rather
+    # than the identity of the max reduction.
+    cms = tf.maximum(tf.reduce_max(cms, axis=0), tf.cast(0.0, dtype))
+    return tf.cast(cms, tf.float32)
 
 
 @attr.s(auto_attribs=True)
@@ -107,11 +135,19 @@ class MultiConfidenceMapGenerator:
             generate confidence maps that are smaller than the input images.
         centroids: If True, generate confidence maps for centroids rather than instance
             points.
+        jit_compile: If True, the confidence map generation is compiled with XLA to
+            fuse its elementwise operations into fewer kernels. The function will be
+            recompiled for each distinct input shape encountered.
+        dtype: Floating point dtype to evaluate the confidence maps in. Set this to
+            tf.bfloat16 or tf.float16 to reduce the memory used during generation. The
+            generated confidence maps are always cast back to tf.float32.
     """
 
     sigma: float = 1.0
     output_stride: int = 1
     centroids: bool = False
+    jit_compile: bool = False
+    dtype: tf.DType = tf.float32
 
     @property
     def input_keys(self) -> List[Text]:
@@ -151,9 +187,7 @@ class MultiConfidenceMapGenerator:
             the original grid prior to scaling operations.
         """
         # Infer image dimensions to generate the full scale sampling grid.
-        test_example = next(iter(input_ds))
-        image_height = test_example["image"].shape[0]
-        image_width = test_example["image"].shape[1]
+        image_height, image_width = get_image_size(input_ds)
 
         # Generate sampling grid vectors.
         xv, yv = make_grid_vectors(
@@ -162,18 +196,29 @@ class MultiConfidenceMapGenerator:
             output_stride=self.output_stride,
         )
 
+        multi_confmaps_fn = make_multi_confmaps
+        if self.jit_compile:
+            multi_confmaps_fn = tf.function(
+                make_multi_confmaps, experimental_compile=True
+            )
+
         def generate_multi_confmaps(example):
             """Local processing function for dataset mapping."""
             if self.centroids:
-                example["centroid_confidence_maps"] = make_multi_confmaps(
+                example["centroid_confidence_maps"] = multi_confmaps_fn(
                     tf.expand_dims(example["centroids"], axis=1),
                     xv=xv,
                     yv=yv,
                     sigma=self.sigma,
+                    dtype=self.dtype,
                 )
             else:
-                example["confidence_maps"] = make_multi_confmaps(
-                    example["instances"], xv=xv, yv=yv, sigma=self.sigma
+                example["confidence_maps"] = multi_confmaps_fn(
+                    example["instances"],
+                    xv=xv,
+                    yv=yv,
+                    sigma=self.sigma,
+                    dtype=self.dtype,
                 )
             return example
 
@@ -196,11 +241,19 @@ class InstanceConfidenceMapGenerator:
             effectively the reciprocal of the output scale, i.e., increase this to
             generate confidence maps that are smaller than the input images.
         all_instances: If True, will also generate the multi-instance confidence maps.
+        jit_compile: If True, the confidence map generation is compiled with XLA to
+            fuse its elementwise operations into fewer kernels. The function will be
+            recompiled for each distinct input shape encountered.
+        dtype: Floating point dtype to evaluate the confidence maps in. Set this to
+            tf.bfloat16 or tf.float16 to reduce the memory used during generation. The
+            generated confidence maps are always cast back to tf.float32.
     """
 
     sigma: float = 1.0
     output_stride: int = 1
     all_instances: bool = False
+    jit_compile: bool = False
+    dtype: tf.DType = tf.float32
 
     @property
     def input_keys(self) -> List[Text]:
@@ -244,9 +297,9 @@ class InstanceConfidenceMapGenerator:
             the original grid prior to scaling operations.
         """
         # Infer image dimensions to generate sampling grid.
-        test_example = next(iter(input_ds))
-        image_height = test_example["instance_image"].shape[0]
-        image_width = test_example["instance_image"].shape[1]
+        image_height, image_width = get_image_size(
+            input_ds, image_key="instance_image"
+        )
 
         # Generate sampling grid vectors.
         xv, yv = make_grid_vectors(
@@ -255,15 +308,34 @@ class InstanceConfidenceMapGenerator:
             output_stride=self.output_stride,
         )
 
+        confmaps_fn = make_confmaps
+        multi_confmaps_fn = make_multi_confmaps
+        if self.jit_compile:
+            confmaps_fn = tf.function(make_confmaps, experimental_compile=True)
+            multi_confmaps_fn = tf.function(
+                make_multi_confmaps, experimental_compile=True
+            )
+
         def generate_confmaps(example):
             """Local processing function for dataset mapping."""
-            example["instance_confidence_maps"] = make_confmaps(
-                example["center_instance"], xv=xv, yv=yv, sigma=self.sigma
+            example["instance_confidence_maps"] = tf.cast(
+                confmaps_fn(
+                    example["center_instance"],
+                    xv=xv,
+                    yv=yv,
+                    sigma=self.sigma,
+                    dtype=self.dtype,
+                ),
+                tf.float32,
             )
 
             if self.all_instances:
-                example["all_instance_confidence_maps"] = make_multi_confmaps(
-                    example["all_instances"], xv=xv, yv=yv, sigma=self.sigma
+                example["all_instance_confidence_maps"] = multi_confmaps_fn(
+                    example["all_instances"],
+                    xv=xv,
+                    yv=yv,
+                    sigma=self.sigma,
+                    dtype=self.dtype,
                 )
 
             return example
@@ -286,10 +358,18 @@ class SingleInstanceConfidenceMapGenerator:
         output_stride: Relative stride of the generated confidence maps. This is
             effectively the reciprocal of the output scale, i.e., increase this to
             generate confidence maps that are smaller than the input images.
+        jit_compile: If True, the confidence map generation is compiled with XLA to
+            fuse its elementwise operations into fewer kernels. The function will be
+            recompiled for each distinct input shape encountered.
+        dtype: Floating point dtype to evaluate the confidence maps in. Set this to
+            tf.bfloat16 or tf.float16 to reduce the memory used during generation. The
+            generated confidence maps are always cast back to tf.float32.
     """
 
     sigma: float = 1.0
     output_stride: int = 1
+    jit_compile: bool = False
+    dtype: tf.DType = tf.float32
 
     @property
     def input_keys(self) -> List[Text]:
@@ -321,9 +401,7 @@ class SingleInstanceConfidenceMapGenerator:
             the original grid prior to scaling operations.
         """
         # Infer image dimensions to generate sampling grid.
-        test_example = next(iter(input_ds))
-        image_height = test_example["image"].shape[0]
-        image_width = test_example["image"].shape[1]
+        image_height, image_width = get_image_size(input_ds)
 
         # Generate sampling grid vectors.
         xv, yv = make_grid_vectors(
@@ -332,17 +410,25 @@ class SingleInstanceConfidenceMapGenerator:
             output_stride=self.output_stride,
         )
 
+        confmaps_fn = make_confmaps
+        if self.jit_compile:
+            confmaps_fn = tf.function(make_confmaps, experimental_compile=True)
+
         def generate_confmaps(example):
             """Local processing function for dataset mapping."""
             # Pull out first instance as (n_nodes, 2) tensor.
             example["points"] = tf.gather(example["instances"], 0, axis=0)
 
             # Generate confidence maps.
-            example["confidence_maps"] = make_confmaps(
-                example["points"],
-                xv=xv,
-                yv=yv,
-                sigma=self.sigma,
+            example["confidence_maps"] = tf.cast(
+                confmaps_fn(
+                    example["points"],
+                    xv=xv,
+                    yv=yv,
+                    sigma=self.sigma,
+                    dtype=self.dtype,
+                ),
+                tf.float32,
             )
 
             return example
@@ -6,10 +6,35 @@ These are mostly wrappers for standard tf.data.Dataset ops.
 import numpy as np
 import tensorflow as tf
 from sleap.nn.data.utils import expand_to_rank
+from sleap.util import usable_cpu_count
 import attr
 from typing import List, Text, Optional, Any, Callable, Dict
 
 
+def make_dataset_options() -> tf.data.Options:
+    """Return dataset options that enable static optimizations used by pipelines.
+
+    Returns:
+        A `tf.data.Options` instance with the map fusion, map and batch fusion, map
+        parallelization, map vectorization and random uniform hoisting graph
+        optimizations enabled. The private threadpool of the dataset will be sized to
+        the number of CPUs usable by the current process.
+
+    Notes:
+        These can be applied to a dataset with `ds.with_options(...)`. The transformers
+        used in pipelines do not rely on side effects in their map functions, so these
+        optimizations do not change the generated data.
+    """
+    options = tf.data.Options()
+    options.experimental_optimization.map_fusion = True
+    options.experimental_optimization.map_and_batch_fusion = True
+    options.experimental_optimization.map_parallelization = True
+    options.experimental_optimization.map_vectorization.enabled = True
+    options.experimental_optimization.hoist_random_uniform = True
+    options.experimental_threading.private_threadpool_size = usable_cpu_count()
+    return options
+
+
 @attr.s(auto_attribs=True)
 class Shuffler:
     """Shuffling transformer for use in pipelines.
@@ -124,7 +149,31 @@ class Batcher:
 
             Any keys that had variable length elements within the batch will be padded
             with NaNs to the size of the largest element's length for that key.
+
+            If all keys have fully defined static shapes, elements are batched directly
+            without the ragged conversion, which allows tf.data to fuse the batching
+            with the preceding map.
         """
+        element_spec = ds_input.element_spec
+        if isinstance(element_spec, dict) and all(
+            isinstance(spec, tf.TensorSpec) and spec.shape.is_fully_defined()
+            for spec in element_spec.values()
+        ):
+
+            def expand_scalars(example):
+                """Expand scalar keys to rank 1."""
+                for key in example:
+                    if example[key].shape.rank == 0:
+                        example[key] = tf.expand_dims(example[key], axis=0)
+                return example
+
+            ds_output = ds_input.map(
+                expand_scalars, num_parallel_calls=tf.data.experimental.AUTOTUNE
+            )
+            ds_output = ds_output.batch(
+                batch_size=self.batch_size, drop_remainder=self.drop_remainder
+            )
+            return ds_output
 
         def expand(example):
             """Expand all keys to a minimum rank of 1."""
@@ -274,6 +323,53 @@ class Prefetcher:
             return ds_input
 
 
+@attr.s(auto_attribs=True)
+class Cacher:
+    """Caching transformer for use in pipelines.
+
+    Stores the elements of the input dataset the first time it is iterated over so
+    that subsequent iterations (e.g., epochs) skip all upstream processing.
+
+    This should only be used when the upstream processing is deterministic, e.g., to
+    cache generated confidence maps or part affinity fields when augmentation is
+    disabled. It should be placed before the `Shuffler` and `Repeater` so that a
+    single epoch of unshuffled elements is cached.
+
+    Attributes:
+        cache: If False, returns the input dataset unmodified.
+        filename: Path to a file to store the cached elements in. If empty (the
+            default), elements are cached in memory.
+    """
+
+    cache: bool = True
+    filename: Text = ""
+
+    @property
+    def input_keys(self) -> List[Text]:
+        """Return the keys that incoming elements are expected to have."""
+        return []
+
+    @property
+    def output_keys(self) -> List[Text]:
+        """Return the keys that outgoing elements will have."""
+        return []
+
+    def transform_dataset(self, ds_input: tf.data.Dataset) -> tf.data.Dataset:
+        """Create a dataset that caches elements after they are first generated.
+
+        Args:
+            ds_input: Any dataset that is not repeated infinitely.
+
+        Returns:
+            A `tf.data.Dataset` with identical elements. The first full iteration over
+            the dataset populates the cache, and subsequent iterations read from it.
+        """
+        if self.cache:
+            return ds_input.cache(filename=self.filename)
+        else:
+            return ds_input
+
+
 @attr.s(auto_attribs=True)
 class Preloader:
     """Preload elements of the underlying dataset to generate in-memory examples.
@@ -281,15 +377,10 @@ class Preloader:
     This transformer can lead to considerable performance improvements at the cost of
     memory consumption.
 
-    This is functionally equivalent to `tf.data.Dataset.cache`, except the cached
-    examples are accessible directly via the `examples` attribute.
-
-    Attributes:
-        examples: Stored list of preloaded elements.
+    This is functionally equivalent to `tf.data.Dataset.cache`, except that examples
+    are loaded when the dataset is created rather than on the first iteration.
     """
 
-    examples: List[Any] = attr.ib(init=False, factory=list)
-
     @property
     def input_keys(self) -> List[Text]:
         """Return the keys that incoming elements are expected to have."""
@@ -310,24 +401,105 @@ class Preloader:
         Return:
             A dataset that generates the same examples.
 
-            This is similar to prefetching, except that examples are yielded through a
-            generator and loaded when this method is called rather than during pipeline
-            iteration.
+            This is similar to prefetching, except that examples are loaded when this
+            method is called rather than during pipeline iteration.
+
+            Keys with the same shape in every example are stacked and sliced directly.
+            Keys with variable shapes are packed into a single flat buffer per key and
+            sliced back out and reshaped within the dataset, so no Python generator is
+            needed. If the rank of a key varies across examples, examples are yielded
+            through a generator instead.
         """
-        # Preload examples from the input dataset.
-        self.examples = list(iter(ds_input))
+        # Preload examples from the input dataset, grouping the values by key so that
+        # each key can be packed and released before the next one.
+        data = {}
+        n_examples = 0
+        for example in ds_input:
+            for key, val in example.items():
+                data.setdefault(key, []).append(val)
+            n_examples += 1
 
         # Store example metadata.
-        keys = list(self.examples[0].keys())
-        dtypes = [self.examples[0][key].dtype for key in keys]
+        keys = list(data.keys())
+        dtypes = [data[key][0].dtype for key in keys]
+
+        # Find the most specific shape that is compatible with all examples.
+        shapes = []
+        for key in keys:
+            shape = data[key][0].shape
+            for val in data[key][1:]:
+                if shape.rank != val.shape.rank:
+                    shape = tf.TensorShape(None)
+                    break
+                shape = tf.TensorShape(
+                    [
+                        dim_a if dim_a == dim_b else None
+                        for dim_a, dim_b in zip(shape.as_list(), val.shape)
+                    ]
+                )
+            shapes.append(shape)
 
-        def gen():
-            for example in self.examples:
-                yield tuple(example[key] for key in keys)
+        if any(shape.rank is None for shape in shapes):
+            # Ranks vary, so fall back to generating the examples from Python.
+            def gen():
+                for i in range(n_examples):
+                    yield tuple(data[key][i] for key in keys)
 
-        ds_output = tf.data.Dataset.from_generator(gen, output_types=tuple(dtypes))
+            ds_output = tf.data.Dataset.from_generator(
+                gen, output_types=tuple(dtypes), output_shapes=tuple(shapes)
+            )
+            ds_output = ds_output.map(
+                lambda *example: {key: val for key, val in zip(keys, example)}
+            )
+            return ds_output
+
+        # Stack fixed size keys so they can be sliced directly.
+        fixed_keys = [
+            key for key, shape in zip(keys, shapes) if shape.is_fully_defined()
+        ]
+        fixed_data = {key: tf.stack(data.pop(key), axis=0) for key in fixed_keys}
+        if len(fixed_keys) == len(keys):
+            # All examples have the same shapes, so we can stack them and slice without
+            # any further processing.
+            return tf.data.Dataset.from_tensor_slices(fixed_data)
+
+        # Pack variable size keys into flat buffers with the offsets and shapes needed
+        # to recover each example.
+        variable_data = {}
+        for key, shape in zip(keys, shapes):
+            if key in fixed_keys:
+                continue
+            values = data.pop(key)
+            sizes = tf.stack([tf.size(val, out_type=tf.int64) for val in values])
+            variable_data[key] = (
+                tf.concat([tf.reshape(val, [-1]) for val in values], axis=0),
+                tf.concat([tf.zeros([1], tf.int64), tf.cumsum(sizes)], axis=0),
+                tf.stack([tf.shape(val, out_type=tf.int64) for val in values]),
+                shape,
+            )
+            del values
+        fixed_data["_example_ind"] = tf.range(n_examples, dtype=tf.int64)
+
+        def unpack(example):
+            """Slice out the variable size keys for a single example."""
+            ind = example["_example_ind"]
+            output = {}
+            for key in keys:
+                if key in variable_data:
+                    buffer, offsets, example_shapes, shape = variable_data[key]
+                    val = tf.reshape(
+                        buffer[offsets[ind] : offsets[ind + 1]], example_shapes[ind]
+                    )
+                    output[key] = tf.ensure_shape(val, shape)
+                else:
+                    output[key] = example[key]
+
+            # The index is only used for slicing, so it is left out of the output.
+            return output
+
+        ds_output = tf.data.Dataset.from_tensor_slices(fixed_data)
         ds_output = ds_output.map(
-            lambda *example: {key: val for key, val in zip(keys, example)}
+            unpack, num_parallel_calls=tf.data.experimental.AUTOTUNE
         )
         return ds_output
 
@@ -8,6 +8,7 @@ import sleap
 from sleap.nn.data.utils import (
     expand_to_rank,
     make_grid_vectors,
+    get_image_size,
     gaussian_pdf,
     ensure_list,
 )
@@ -57,8 +58,8 @@ def distance_to_edge(
     # Project points to edge line.
     line_projections = tf.reduce_sum(
         source_relative_points * expand_to_rank(direction_vector, n_pt_dims + 2), axis=3
-    ) / expand_to_rank(
-        edge_length, n_pt_dims + 1
+    ) * expand_to_rank(
+        1.0 / edge_length, n_pt_dims + 1
     )  # (..., n_edges)
 
     # Crop to line segment.
@@ -79,6 +80,25 @@ def distance_to_edge(
     return distances
 
 
+def make_unit_vectors(vectors: tf.Tensor) -> tf.Tensor:
+    """Normalize vectors to unit length.
+
+    Args:
+        vectors: Tensor of dtype tf.float32 of shape (..., 2) where the last axis
+            corresponds to x- and y-components of the vectors.
+
+    Returns:
+        A tensor of the same shape and dtype as `vectors` with each vector scaled to
+        unit length. Vectors of zero length or containing NaNs are replaced with zeros.
+
+    Notes:
+        This computes the reciprocal of the vector norms with a single `rsqrt` of the
+        squared norms and multiplies by it rather than dividing by the norms.
+    """
+    squared_norms = tf.reduce_sum(tf.square(vectors), axis=-1, keepdims=True)
+    return tf.where(squared_norms > 0, vectors * tf.math.rsqrt(squared_norms), 0.0)
+
+
 def make_edge_maps(
     xv: tf.Tensor,
     yv: tf.Tensor,
@@ -146,9 +166,11 @@ def make_pafs(
         sampling grid being on each edge. These will be in a tensor of shape
         (grid_height, grid_width, n_edges, 2) of dtype tf.float32. The last axis
         corresponds to the x- and y-coordinates of the unit vectors.
+
+        Edges of zero length have no direction, so their unit vectors and PAFs will be
+        all zeros.
     """
-    unit_vectors = edge_destination - edge_source
-    unit_vectors = unit_vectors / tf.linalg.norm(unit_vectors, axis=-1, keepdims=True)
+    unit_vectors = make_unit_vectors(edge_destination - edge_source)
     edge_confidence_map = make_edge_maps(
         xv=xv,
         yv=yv,
@@ -191,21 +213,35 @@ def make_multi_pafs(
         A set of part affinity fields generated for each instance. These will be in a
         tensor of shape (grid_height, grid_width, n_edges, 2). If multiple instance
         PAFs are defined on the same pixel, they will be summed.
+
+    Notes:
+        The edge maps for all instances are computed in a single vectorized operation
+        by treating the edges of all instances as one set of edges. They are then
+        weighted by the unit vectors and summed across instances in a single
+        contraction, which avoids materializing the per-instance PAFs of shape
+        (grid_height, grid_width, n_instances, n_edges, 2).
     """
     grid_height = tf.shape(yv)[0]
     grid_width = tf.shape(xv)[0]
     n_edges = tf.shape(edge_sources)[1]
     n_instances = tf.shape(edge_sources)[0]
-    pafs = tf.zeros((grid_height, grid_width, n_edges, 2), tf.float32)
-    for i in range(n_instances):
-        paf = make_pafs(
-            xv=xv,
-            yv=yv,
-            edge_source=tf.gather(edge_sources, i, axis=0),
-            edge_destination=tf.gather(edge_destinations, i, axis=0),
-            sigma=sigma,
-        )
-        pafs += tf.where(tf.math.is_nan(paf), 0., paf)
+
+    # Compute the edge maps of all instance edges at once.
+    edge_maps = make_edge_maps(
+        xv=xv,
+        yv=yv,
+        edge_source=tf.reshape(edge_sources, [-1, 2]),
+        edge_destination=tf.reshape(edge_destinations, [-1, 2]),
+        sigma=sigma,
+    )  # (grid_height, grid_width, n_instances * n_edges)
+    edge_maps = tf.reshape(edge_maps, [grid_height, grid_width, n_instances, n_edges])
+    edge_maps = tf.where(tf.math.is_nan(edge_maps), 0.0, edge_maps)
+
+    # Compute unit vectors, ignoring missing or degenerate edges.
+    unit_vectors = make_unit_vectors(edge_destinations - edge_sources)
+
+    # Weight by the unit vectors and sum over instances.
+    pafs = tf.einsum("hwie,iec->hwec", edge_maps, unit_vectors)
 
     return pafs
 
@@ -253,6 +289,9 @@ class PartAffinityFieldsGenerator:
         flatten_channels: If False, the generated tensors are of shape
             [height, width, n_edges, 2]. If True, generated tensors are of shape
             [height, width, n_edges * 2] by flattening the last 2 axes.
+        jit_compile: If True, the part affinity field generation is compiled with XLA
+            to fuse its elementwise operations into fewer kernels. The function will be
+            recompiled for each distinct number of instances encountered.
     """
 
     sigma: float = attr.ib(default=1.0, converter=float)
@@ -261,6 +300,7 @@ class PartAffinityFieldsGenerator:
         default=None, converter=attr.converters.optional(ensure_list)
     )
     flatten_channels: bool = False
+    jit_compile: bool = False
 
     @property
     def input_keys(self) -> List[Text]:
@@ -302,9 +342,7 @@ class PartAffinityFieldsGenerator:
             the original grid prior to scaling operations.
         """
         # Infer image dimensions to generate sampling grid.
-        test_example = next(iter(input_ds))
-        image_height = test_example["image"].shape[0]
-        image_width = test_example["image"].shape[1]
+        image_height, image_width = get_image_size(input_ds)
 
         # Generate sampling grid vectors.
         xv, yv = make_grid_vectors(
@@ -320,6 +358,10 @@ class PartAffinityFieldsGenerator:
         edge_inds = tf.cast(self.skeletons[0].edge_inds, dtype=tf.int32)
         n_edges = len(edge_inds)
 
+        multi_pafs_fn = make_multi_pafs
+        if self.jit_compile:
+            multi_pafs_fn = tf.function(make_multi_pafs, experimental_compile=True)
+
         def generate_pafs(example):
             """Local processing function for dataset mapping."""
             edge_sources, edge_destinations = get_edge_points(
@@ -328,18 +370,19 @@ class PartAffinityFieldsGenerator:
             edge_sources = tf.ensure_shape(edge_sources, (None, n_edges, 2))
             edge_destinations = tf.ensure_shape(edge_destinations, (None, n_edges, 2))
 
-            pafs = make_multi_pafs(
+            pafs = multi_pafs_fn(
                 xv=xv,
                 yv=yv,
                 edge_sources=edge_sources,
                 edge_destinations=edge_destinations,
                 sigma=self.sigma,
             )
-            pafs = tf.ensure_shape(pafs, (grid_height, grid_width, n_edges, 2))
-
             if self.flatten_channels:
+                # The (x, y) components are already innermost, so flattening them into
+                # the edges axis does not copy data.
                 pafs = tf.reshape(pafs, [grid_height, grid_width, n_edges * 2])
-                pafs = tf.ensure_shape(pafs, (grid_height, grid_width, n_edges * 2))
+            else:
+                pafs = tf.ensure_shape(pafs, (grid_height, grid_width, n_edges, 2))
 
             example["part_affinity_fields"] = pafs
 
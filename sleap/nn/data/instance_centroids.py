@@ -26,9 +26,17 @@ def find_points_bbox_midpoint(points: tf.Tensor) -> tf.Tensor:
                    = ((2 * xy_min) / 2) + ((xy_max - xy_min) / 2)
                    = (2 * xy_min + xy_max - xy_min) / 2
                    = (xy_min + xy_max) / 2
+
+        NaNs are replaced with +inf and -inf sentinels before the min and max
+        reductions respectively, so dense reductions can be used without masking.
     """
-    pts_min = tf.reduce_min(points, axis=-2)
-    pts_max = tf.reduce_max(points, axis=-2)
+    is_finite = tf.math.is_finite(points)
+    pts_min = tf.reduce_min(
+        tf.where(is_finite, points, tf.cast(float("inf"), points.dtype)), axis=-2
+    )
+    pts_max = tf.reduce_max(
+        tf.where(is_finite, points, tf.cast(float("-inf"), points.dtype)), axis=-2
+    )
     return (pts_max + pts_min) * 0.5
 
 
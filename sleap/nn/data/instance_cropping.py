@@ -74,8 +74,8 @@ def normalize_bboxes(
         - 1
     )
 
-    # Normalize and return.
-    normalized_bboxes = bboxes / factor
+    # Normalize by multiplying with the reciprocal of the factor and return.
+    normalized_bboxes = bboxes * (1.0 / factor)
     return normalized_bboxes
 
 
@@ -182,6 +182,10 @@ def crop_bboxes(image: tf.Tensor, bboxes: tf.Tensor) -> tf.Tensor:
         (y1, x1, y2, x2) = (0, 0, 2, 2). This would be exactly equivalent to indexing
         the image with `image[0:3, 0:3]`.
 
+        When all bounding boxes are aligned to integer pixel coordinates, the crops are
+        gathered directly from the image without interpolation. Pixels that fall outside
+        of the image are filled with zeros in both cases.
+
     See also: `make_centered_bboxes`
     """
     # Compute bounding box size to use for crops.
@@ -189,24 +193,60 @@ def crop_bboxes(image: tf.Tensor, bboxes: tf.Tensor) -> tf.Tensor:
     y2x2 = tf.gather_nd(bboxes, [[0, 2], [0, 3]])
     box_size = tf.cast(tf.math.round((y2x2 - y1x1) + 1), tf.int32)  # (height, width)
 
-    # Normalize bounding boxes.
     image_height = tf.shape(image)[0]
     image_width = tf.shape(image)[1]
-    normalized_bboxes = normalize_bboxes(
-        bboxes, image_height=image_height, image_width=image_width
-    )
 
-    # Crop.
-    crops = tf.image.crop_and_resize(
-        image=tf.expand_dims(image, axis=0),
-        boxes=normalized_bboxes,
-        box_indices=tf.zeros([tf.shape(bboxes)[0]], dtype=tf.int32),
-        crop_size=box_size,
-        method="bilinear",
-    )
+    def gather_crops():
+        """Crop integer aligned bounding boxes by indexing into the image."""
+        bboxes_y1x1 = tf.cast(tf.math.round(bboxes[:, :2]), tf.int32)  # (n_bboxes, 2)
+        ys = tf.expand_dims(bboxes_y1x1[:, 0], axis=1) + tf.range(box_size[0])
+        xs = tf.expand_dims(bboxes_y1x1[:, 1], axis=1) + tf.range(box_size[1])
+
+        # Build pixel subscripts of shape (n_bboxes, crop_height, crop_width, 2),
+        # clamped to the image bounds.
+        yx = tf.stack(
+            [
+                tf.tile(
+                    tf.expand_dims(tf.clip_by_value(ys, 0, image_height - 1), 2),
+                    [1, 1, box_size[1]],
+                ),
+                tf.tile(
+                    tf.expand_dims(tf.clip_by_value(xs, 0, image_width - 1), 1),
+                    [1, box_size[0], 1],
+                ),
+            ],
+            axis=-1,
+        )
+        crops = tf.gather_nd(image, yx)
+
+        # Zero out pixels that were outside of the image.
+        in_bounds = tf.logical_and(
+            tf.expand_dims((ys >= 0) & (ys < image_height), axis=2),
+            tf.expand_dims((xs >= 0) & (xs < image_width), axis=1),
+        )
+        return tf.where(tf.expand_dims(in_bounds, axis=-1), crops, tf.zeros_like(crops))
 
-    # Cast back to original dtype and return.
-    crops = tf.cast(crops, image.dtype)
+    def resize_crops():
+        """Crop bounding boxes with bilinear interpolation."""
+        # Normalize bounding boxes.
+        normalized_bboxes = normalize_bboxes(
+            bboxes, image_height=image_height, image_width=image_width
+        )
+
+        # Crop.
+        crops = tf.image.crop_and_resize(
+            image=tf.expand_dims(image, axis=0),
+            boxes=normalized_bboxes,
+            box_indices=tf.zeros([tf.shape(bboxes)[0]], dtype=tf.int32),
+            crop_size=box_size,
+            method="bilinear",
+        )
+
+        # Cast back to original dtype.
+        return tf.cast(crops, image.dtype)
+
+    is_integer_aligned = tf.reduce_all(tf.equal(bboxes, tf.math.round(bboxes)))
+    crops = tf.cond(is_integer_aligned, gather_crops, resize_crops)
     return crops
 
 
@@ -340,10 +380,9 @@ class InstanceCropper:
 
             Additional keys will be replicated in each example under the same name.
         """
-        # Draw a test example from the input dataset to find extra keys to replicate.
-        test_example = next(iter(input_ds))
+        # Find extra keys to replicate from the structure of the input dataset.
         keys_to_expand = [
-            key for key in test_example.keys() if key not in self.input_keys
+            key for key in input_ds.element_spec.keys() if key not in self.input_keys
         ]
         if self.keep_full_image:
             keys_to_expand.append("image")
@@ -363,21 +402,17 @@ class InstanceCropper:
             # Pull out the bbox offsets as (n_instances, 2) in xy order.
             bboxes_x1y1 = tf.gather(bboxes, [1, 0], axis=1)
 
-            # Expand the instance points to (n_instances, n_instances, n_nodes, 2).
+            # Subtract offsets such that each row is relative to an instance. This
+            # broadcasts to (n_instances, n_instances, n_nodes, 2).
             n_instances = tf.shape(bboxes)[0]
-            all_instances = tf.repeat(
-                tf.expand_dims(frame_data["instances"], axis=0), n_instances, axis=0
-            )
-
-            # Subtract offsets such that each row is relative to an instance.
-            all_instances = all_instances - tf.reshape(
-                bboxes_x1y1, [n_instances, 1, 1, 2]
-            )
-
-            # Pull out the centered instance from each row as (n_instances, n_nodes, 2).
-            center_instances = tf.gather_nd(
-                all_instances,
-                tf.stack([tf.range(n_instances), tf.range(n_instances)], axis=1),
+            all_instances = tf.expand_dims(
+                frame_data["instances"], axis=0
+            ) - tf.reshape(bboxes_x1y1, [n_instances, 1, 1, 2])
+
+            # Offset each instance by its own bbox as (n_instances, n_nodes, 2). This is
+            # the diagonal of all_instances computed directly.
+            center_instances = frame_data["instances"] - tf.reshape(
+                bboxes_x1y1, [n_instances, 1, 2]
             )
 
             # Create multi-instance example.
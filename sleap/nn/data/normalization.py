@@ -206,9 +206,9 @@ def scale_to_imagenet_caffe_mode(image: tf.Tensor) -> tf.Tensor:
                will be expanded to (height, width, 1).
             2. Convert to RGB if not already in 3 channel format.
             3. Reverse the channel ordering to convert RGB to BGR format.
-            4. Convert to tf.float32 in the range [0.0, 1.0].
-            5. Scale the values to the range [0.0, 255.0].
-            6. Subtract the ImageNet mean values (103.939, 116.779, 123.68) for channels
+            4. Convert to tf.float32 in the range [0.0, 255.0]. Integer images are
+               cast and scaled in a single step, so uint8 images are cast directly.
+            5. Subtract the ImageNet mean values (103.939, 116.779, 123.68) for channels
                in BGR format.
 
         This preprocessing mode is required when using pretrained ResNetV1 models.
@@ -216,10 +216,13 @@ def scale_to_imagenet_caffe_mode(image: tf.Tensor) -> tf.Tensor:
     image = ensure_min_image_rank(image)  # at least [height, width, 1]
     image = ensure_rgb(image)  # 3 channels
     image = convert_rgb_to_bgr(image)  # reverse channel order
-    image = ensure_float(image)  # float32 in range [0., 1.]
-    image = scale_image_range(
-        image, min_val=0.0, max_val=255.0
-    )  # float32 in range [0, 255]
+    if image.dtype.is_integer:
+        scale = 255.0 / image.dtype.max
+        image = tf.cast(image, tf.float32)
+        if scale != 1.0:
+            image = image * scale  # float32 in range [0, 255]
+    else:
+        image = tf.cast(image, tf.float32) * 255.0  # float32 in range [0, 255]
     imagenet_mean = tf.convert_to_tensor(
         [103.939, 116.779, 123.68], tf.float32
     )  # [B, G, R]
@@ -267,7 +270,7 @@ def scale_to_imagenet_torch_mode(image: tf.Tensor) -> tf.Tensor:
         imagenet_mean, tf.rank(image)
     )  # subtract from channels
     imagenet_std = tf.convert_to_tensor([0.229, 0.224, 0.225], tf.float32)  # [R, G, B]
-    image = image / expand_to_rank(imagenet_std, tf.rank(image))
+    image = image * expand_to_rank(1.0 / imagenet_std, tf.rank(image))
     return image
 
 
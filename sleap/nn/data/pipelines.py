@@ -14,7 +14,11 @@ from typing import Sequence, Text, Optional, List, Tuple, Union, TypeVar
 
 import sleap
 from sleap.nn.data.providers import LabelsReader, VideoReader
-from sleap.nn.data.augmentation import AugmentationConfig, ImgaugAugmenter
+from sleap.nn.data.augmentation import (
+    AugmentationConfig,
+    ImgaugAugmenter,
+    TensorFlowAugmenter,
+)
 from sleap.nn.data.normalization import Normalizer
 from sleap.nn.data.resizing import Resizer, PointsRescaler
 from sleap.nn.data.instance_centroids import InstanceCentroidFinder
@@ -31,8 +35,10 @@ from sleap.nn.data.dataset_ops import (
     Unbatcher,
     Repeater,
     Prefetcher,
+    Cacher,
     Preloader,
     LambdaFilter,
+    make_dataset_options,
 )
 from sleap.nn.data.training import KeyMapper
 from sleap.nn.data.general import KeyFilter, KeyRenamer, KeyDeviceMover
@@ -59,6 +65,7 @@ from sleap.nn.heads import (
 PROVIDERS = (LabelsReader, VideoReader)
 TRANSFORMERS = (
     ImgaugAugmenter,
+    TensorFlowAugmenter,
     Normalizer,
     Resizer,
     InstanceCentroidFinder,
@@ -72,6 +79,7 @@ TRANSFORMERS = (
     Unbatcher,
     Repeater,
     Prefetcher,
+    Cacher,
     Preloader,
     LambdaFilter,
     KeyMapper,
@@ -98,10 +106,14 @@ class Pipeline:
     Attributes:
         providers: A single or a list of data providers.
         transformers: A single or a list of transformers.
+        optimize_dataset: If True, the static optimizations and threading options from
+            `make_dataset_options` are applied to the generated dataset. This is enabled
+            by the training pipeline builders.
     """
 
     providers: List[Provider] = attr.ib(converter=ensure_list, factory=list)
     transformers: List[Transformer] = attr.ib(converter=ensure_list, factory=list)
+    optimize_dataset: bool = False
 
     @classmethod
     def from_blocks(
@@ -142,14 +154,19 @@ class Pipeline:
 
         Returns:
             A new `Pipeline` instance formed by concatenating the individual pipelines.
+            Dataset optimizations are enabled if they were enabled in any of them.
         """
         blocks = []
+        optimize_dataset = False
         for pipeline in pipelines:
             if isinstance(pipeline, PROVIDERS + TRANSFORMERS):
                 pipeline = cls.from_blocks(pipeline)
             blocks.extend(pipeline.providers)
             blocks.extend(pipeline.transformers)
-        return cls.from_blocks(blocks)
+            optimize_dataset = optimize_dataset or pipeline.optimize_dataset
+        new_pipeline = cls.from_blocks(blocks)
+        new_pipeline.optimize_dataset = optimize_dataset
+        return new_pipeline
 
     def __add__(self, other: "Pipeline") -> "Pipeline":
         """Overload for + operator concatenation."""
@@ -182,6 +199,9 @@ class Pipeline:
         elif hasattr(other, "providers") and hasattr(other, "transformers"):
             self.providers.extend(other.providers)
             self.transformers.extend(other.transformers)
+            self.optimize_dataset = self.optimize_dataset or getattr(
+                other, "optimize_dataset", False
+            )
         else:
             raise ValueError(
                 "Cannot append blocks that are not pipelines or transformers."
@@ -267,6 +287,10 @@ class Pipeline:
         for transformer in self.transformers:
             ds = transformer.transform_dataset(ds)
 
+        if self.optimize_dataset:
+            # Enable static optimizations on the whole pipeline.
+            ds = ds.with_options(make_dataset_options())
+
         return ds
 
 
@@ -316,7 +340,7 @@ class BottomUpPipeline:
             This does not remap keys to model outputs. Use `KeyMapper` to pull out keys
             with the appropriate format for the instantiated `tf.keras.Model`.
         """
-        pipeline = Pipeline(providers=data_provider)
+        pipeline = Pipeline(providers=data_provider, optimize_dataset=True)
 
         if self.optimization_config.preload_data:
             pipeline += Preloader()
@@ -324,7 +348,7 @@ class BottomUpPipeline:
         if self.optimization_config.online_shuffling:
             pipeline += Shuffler(self.optimization_config.shuffle_buffer_size)
 
-        pipeline += ImgaugAugmenter.from_config(
+        pipeline += TensorFlowAugmenter.from_config(
             self.optimization_config.augmentation_config
         )
         pipeline += Normalizer.from_config(self.data_config.preprocessing)
@@ -449,7 +473,7 @@ class CentroidConfmapsPipeline:
             This does not remap keys to model outputs. Use `KeyMapper` to pull out keys
             with the appropriate format for the instantiated `tf.keras.Model`.
         """
-        pipeline = Pipeline(providers=data_provider)
+        pipeline = Pipeline(providers=data_provider, optimize_dataset=True)
 
         if self.optimization_config.preload_data:
             pipeline += Preloader()
@@ -457,7 +481,7 @@ class CentroidConfmapsPipeline:
         if self.optimization_config.online_shuffling:
             pipeline += Shuffler(self.optimization_config.shuffle_buffer_size)
 
-        pipeline += ImgaugAugmenter.from_config(
+        pipeline += TensorFlowAugmenter.from_config(
             self.optimization_config.augmentation_config
         )
         pipeline += Normalizer.from_config(self.data_config.preprocessing)
@@ -577,7 +601,7 @@ class TopdownConfmapsPipeline:
             This does not remap keys to model outputs. Use `KeyMapper` to pull out keys
             with the appropriate format for the instantiated `tf.keras.Model`.
         """
-        pipeline = Pipeline(providers=data_provider)
+        pipeline = Pipeline(providers=data_provider, optimize_dataset=True)
 
         if self.optimization_config.preload_data:
             pipeline += Preloader()
@@ -585,7 +609,7 @@ class TopdownConfmapsPipeline:
         if self.optimization_config.online_shuffling:
             pipeline += Shuffler(self.optimization_config.shuffle_buffer_size)
 
-        pipeline += ImgaugAugmenter.from_config(
+        pipeline += TensorFlowAugmenter.from_config(
             self.optimization_config.augmentation_config
         )
         pipeline += Normalizer.from_config(self.data_config.preprocessing)
@@ -698,7 +722,7 @@ class SingleInstanceConfmapsPipeline:
             This does not remap keys to model outputs. Use `KeyMapper` to pull out keys
             with the appropriate format for the instantiated `tf.keras.Model`.
         """
-        pipeline = Pipeline(providers=data_provider)
+        pipeline = Pipeline(providers=data_provider, optimize_dataset=True)
 
         if self.optimization_config.preload_data:
             pipeline += Preloader()
@@ -706,7 +730,7 @@ class SingleInstanceConfmapsPipeline:
         if self.optimization_config.online_shuffling:
             pipeline += Shuffler(self.optimization_config.shuffle_buffer_size)
 
-        pipeline += ImgaugAugmenter.from_config(
+        pipeline += TensorFlowAugmenter.from_config(
             self.optimization_config.augmentation_config
         )
         pipeline += Normalizer.from_config(self.data_config.preprocessing)
@@ -1,7 +1,7 @@
 """Miscellaneous utility functions for data processing."""
 
 import tensorflow as tf
-from typing import Any, List, Tuple
+from typing import Any, List, Text, Tuple
 
 
 def ensure_list(x: Any) -> List[Any]:
@@ -69,6 +69,31 @@ def make_grid_vectors(
     return xv, yv
 
 
+def get_image_size(ds: tf.data.Dataset, image_key: Text = "image") -> Tuple[int, int]:
+    """Return the size of the images in the elements of a dataset.
+
+    Args:
+        ds: A `tf.data.Dataset` whose elements are dictionaries containing images of
+            shape (height, width, channels).
+        image_key: String name of the key containing the images.
+
+    Returns:
+        Tuple of (image_height, image_width) as integers.
+
+        The static shape of the dataset elements is used when it is fully defined.
+        Otherwise, an example is drawn from the dataset to determine the size, which
+        requires running all of the upstream processing for one element.
+    """
+    image_shape = ds.element_spec[image_key].shape
+    if image_shape.rank is not None and image_shape[:2].is_fully_defined():
+        image_height, image_width = image_shape[:2].as_list()
+    else:
+        test_example = next(iter(ds))
+        image_height = test_example[image_key].shape[0]
+        image_width = test_example[image_key].shape[1]
+    return image_height, image_width
+
+
 def gaussian_pdf(x: tf.Tensor, sigma: float) -> tf.Tensor:
     """Compute the PDF of an unnormalized 0-centered Gaussian distribution.
 
@@ -3,6 +3,8 @@ A miscellaneous set of utility functions. Try not to put things in here
 unless they really have no other place.
 """
 
+import functools
+import operator
 import os
 import re
 import subprocess
@@ -15,15 +17,75 @@ from pkg_resources import Requirement, resource_filename
 import h5py as h5
 import numpy as np
 import attr
-import psutil
 import json
 import rapidjson
 import yaml
 
-from typing import Any, Dict, Hashable, Iterable, List, Optional
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Sequence
 
 from sleap.io import pathutils
 
+# HDF5 dtype used for variable length string fields.
+_VLEN_STR = h5.special_dtype(vlen=str)
+
+
+def _probe_npystrings():
+    """
+    Returns a NumPy `StringDType` instance if it can be used for string fields.
+
+    This requires a NumPy version with `StringDType`, h5py >= 3.14 which can read and
+    write it natively, and support for it within structured dtypes. Since the
+    structured arrays are stored in compound datasets, this is checked by writing
+    one to an in-memory HDF5 file and reading it back.
+
+    Returns:
+        A `StringDType` instance or None if it cannot be used.
+    """
+    string_dtype = getattr(getattr(np, "dtypes", None), "StringDType", None)
+    if string_dtype is None:
+        return None
+
+    if tuple(h5.version.version_tuple[:2]) < (3, 14):
+        return None
+
+    try:
+        data = np.array([("probe",)], dtype=[("probe", string_dtype())])
+        with h5.File("probe.h5", "w", driver="core", backing_store=False) as f:
+            f.create_dataset("probe", data=data)
+            value = f["probe"][0]["probe"]
+    except (TypeError, ValueError, NotImplementedError, OSError):
+        return None
+
+    if isinstance(value, bytes):
+        value = value.decode("utf-8")
+    if value != "probe":
+        return None
+
+    return string_dtype()
+
+
+# NumPy native string dtype used for variable length string fields when supported.
+_NPY_STR = _probe_npystrings()
+_USE_NPYSTRINGS = _NPY_STR is not None
+
+# Error messages for fields that cannot be converted by `attr_to_dtype`.
+_NO_TYPE_ERR = (
+    "numpy dtype for {cls} cannot be constructed: field {name!r} has no type "
+    "annotation. Make sure each field is type annotated."
+)
+_ERR = (
+    "numpy dtype for {cls} cannot be constructed: field {name!r} has unsupported "
+    "type {typ!r}."
+)
+
+# Mapping from supported attrs field types to numpy dtypes for `attr_to_dtype`.
+_FIELD_DTYPES = {
+    str: _NPY_STR if _USE_NPYSTRINGS else _VLEN_STR,
+    int: int,
+    float: float,
+    bool: bool,
+}
+
 
 def json_loads(json_str: str) -> Dict:
     """
@@ -62,34 +124,153 @@ def json_dumps(d: Dict, filename: str = None):
         return encoder.dumps(d)
 
 
-def attr_to_dtype(cls: Any):
+@functools.lru_cache(maxsize=None)
+def _fields(cls: Any) -> tuple:
+    """Return the attrs fields of a class, cached per class."""
+    return attr.fields(cls)
+
+
+def attr_to_dtype(cls: Any, max_str_len: Optional[Dict[str, int]] = None):
     """
     Converts classes with basic types to numpy composite dtypes.
 
+    The dtype is computed once per class (and string lengths) and cached for
+    subsequent calls.
+
     Arguments:
         cls: class to convert
+        max_str_len: Optional dict mapping names of `str` fields to the maximum
+            length in bytes of their UTF-8 encoded values. These fields will be
+            stored as fixed-length strings, which have a contiguous layout and
+            allow HDF5 compression filters to compress the zero-padded tails.
+            Other `str` fields will be stored as variable-length strings, using
+            NumPy's native `StringDType` when supported by the installed NumPy and
+            h5py (>= 3.14) versions, or object dtype otherwise.
 
     Returns:
         numpy dtype.
     """
-    dtype_list = []
-    for field in attr.fields(cls):
-        if field.type == str:
-            dtype_list.append((field.name, h5.special_dtype(vlen=str)))
-        elif field.type is None:
-            raise TypeError(
-                f"numpy dtype for {cls} cannot be constructed because no "
-                + "type information found. Make sure each field is type annotated."
-            )
-        elif field.type in [str, int, float, bool]:
-            dtype_list.append((field.name, field.type))
-        else:
-            raise TypeError(
-                f"numpy dtype for {cls} cannot be constructed because no "
-                + f"{field.type} is not supported."
-            )
+    if max_str_len is None:
+        max_str_len = {}
+    return _attr_to_dtype(cls, tuple(sorted(max_str_len.items())))
+
+
+@functools.lru_cache(maxsize=None)
+def _attr_to_dtype(cls: Any, max_str_len: tuple):
+    """Build the numpy dtype for `attr_to_dtype` given hashable string lengths."""
+    max_str_len = dict(max_str_len)
+    names, formats = [], []
+    for field in _fields(cls):
+        if field.type is None:
+            raise TypeError(_NO_TYPE_ERR.format(cls=cls, name=field.name))
+
+        dtype = _FIELD_DTYPES.get(field.type)
+        if dtype is None:
+            raise TypeError(_ERR.format(cls=cls, name=field.name, typ=field.type))
 
-    return np.dtype(dtype_list)
+        if field.type is str and field.name in max_str_len:
+            dtype = h5.string_dtype("utf-8", max_str_len[field.name])
+
+        names.append(field.name)
+        formats.append(dtype)
+
+    return np.dtype({"names": names, "formats": formats})
+
+
+def attrs_to_struct(
+    objs: Sequence[Any], cls: Any, max_str_len: Optional[Dict[str, int]] = None
+) -> np.ndarray:
+    """
+    Converts a sequence of attrs objects to a numpy structured array.
+
+    This is the preferred way to build records for bulk writes to compound HDF5
+    datasets, since all records are converted in a single pass rather than one at a
+    time.
+
+    Arguments:
+        objs: sequence of instances of `cls` to convert
+        cls: attrs class of the objects, with basic types (see `attr_to_dtype`)
+        max_str_len: optional maximum string lengths passed to `attr_to_dtype`
+
+    Returns:
+        numpy structured array of shape (len(objs),) with dtype given by
+        `attr_to_dtype`.
+
+    Raises:
+        ValueError: If the UTF-8 encoded value of a field in `max_str_len` is longer
+            than its maximum length.
+    """
+    dtype = attr_to_dtype(cls, max_str_len=max_str_len)
+
+    names = [field.name for field in _fields(cls)]
+    if not names:
+        return np.empty(len(objs), dtype=dtype)
+
+    # Read all fields of each object with a single C-level call.
+    get_values = operator.attrgetter(*names)
+    single_field = len(names) == 1
+
+    # Fixed-length string fields store bytes, so encode their values as UTF-8 rather
+    # than letting numpy encode them as ASCII and truncate them silently.
+    fixed_str_fields = [
+        (i, name, dtype[name].itemsize)
+        for i, name in enumerate(names)
+        if dtype[name].kind == "S"
+    ]
+
+    def get_record(obj):
+        values = get_values(obj)
+        if single_field:
+            # attrgetter returns a bare value rather than a tuple for a single field.
+            values = (values,)
+        if fixed_str_fields:
+            values = list(values)
+            for i, name, max_len in fixed_str_fields:
+                values[i] = values[i].encode("utf-8")
+                if len(values[i]) > max_len:
+                    raise ValueError(
+                        f"Value of field {name!r} is {len(values[i])} bytes long "
+                        f"when encoded as UTF-8, which exceeds its maximum length of "
+                        f"{max_len}."
+                    )
+            values = tuple(values)
+        return values
+
+    # np.fromiter avoids building an intermediate list of records, but does not
+    # support variable length (object or StringDType) fields.
+    if any(dtype[name].kind in "OT" for name in dtype.names):
+        records = np.empty(len(objs), dtype=dtype)
+        for i, obj in enumerate(objs):
+            records[i] = get_record(obj)
+        return records
+    return np.fromiter(map(get_record, objs), dtype=dtype, count=len(objs))
+
+
+@functools.lru_cache(maxsize=1)
+def usable_cpu_set() -> frozenset:
+    """
+    Gets the set of CPU ids usable by the current process.
+
+    Takes into consideration cpusets restrictions. This is useful for pinning workers
+    to specific CPUs with `os.sched_setaffinity` without oversubscribing them. The
+    result is computed once and cached for the lifetime of the process. If the CPU
+    affinity of the process is changed at runtime, call `usable_cpu_set.cache_clear()`
+    to recompute it.
+
+    Returns:
+        A frozenset of the ids of the usable cpus
+    """
+    try:
+        result = os.sched_getaffinity(0)
+    except AttributeError:
+        try:
+            # Only imported when needed since it is slow to import and rarely used.
+            import psutil
+
+            result = psutil.Process().cpu_affinity()
+        except (ImportError, AttributeError):
+            result = range(os.cpu_count() or 1)
+    return frozenset(result)
 
 
 def usable_cpu_count() -> int:
@@ -100,15 +281,14 @@ def usable_cpu_count() -> int:
 
     Returns:
         The number of usable cpus
+
+    See also: usable_cpu_set
     """
-    try:
-        result = len(os.sched_getaffinity(0))
-    except AttributeError:
-        try:
-            result = len(psutil.Process().cpu_affinity())
-        except AttributeError:
-            result = os.cpu_count()
-    return result
+    return len(usable_cpu_set())
+
+
+# The count is derived from the cached set, so clearing either resets both.
+usable_cpu_count.cache_clear = usable_cpu_set.cache_clear
 
 
 def save_dict_to_hdf5(h5file: h5.File, path: str, dic: dict):
@@ -1,10 +1,11 @@
 import pytest
 import os
+import shutil
 import h5py
 
 import numpy as np
 
-from sleap.io.video import Video, HDF5Video, MediaVideo, DummyVideo
+from sleap.io.video import Video, HDF5Video, MediaVideo, DummyVideo, SingleImageVideo
 from tests.fixtures.videos import (
     TEST_H5_FILE,
     TEST_SMALL_ROBOT_MP4_FILE,
@@ -65,6 +66,16 @@ def test_hd5f_file_not_found():
         Video.from_hdf5("non-existent-filename.h5", "dataset_name").height
 
 
+def test_hdf5_file_invalid(tmpdir):
+    filename = os.path.join(tmpdir, "invalid.h5")
+    with open(filename, "w") as f:
+        f.write("not an hdf5 file")
+
+    with pytest.raises(OSError) as excinfo:
+        Video.from_hdf5(filename, "dataset_name").height
+    assert not isinstance(excinfo.value, FileNotFoundError)
+
+
 def test_mp4_get_shape(small_robot_mp4_vid):
     assert small_robot_mp4_vid.shape == (166, 320, 560, 3)
 
@@ -338,6 +349,59 @@ def test_images_video():
     assert vid[0].shape == (1, 320, 560, 3)
 
 
+def test_images_video_relocated_filenames(tmpdir):
+    for i in range(3):
+        shutil.copy(f"tests/data/videos/robot{i}.jpg", tmpdir)
+
+    vid = Video(
+        backend=SingleImageVideo(
+            filename=os.path.join(tmpdir, "robot0.jpg"),
+            filenames=[os.path.join("missing_dir", f"robot{i}.jpg") for i in range(3)],
+        )
+    )
+    assert vid.height == 320
+    assert vid[1].shape == (1, 320, 560, 3)
+
+    # Files that disappear after they were located are reported as missing.
+    os.remove(os.path.join(tmpdir, "robot2.jpg"))
+    with pytest.raises(FileNotFoundError):
+        vid.get_frame(2)
+
+    os.remove(os.path.join(tmpdir, "robot0.jpg"))
+    with pytest.raises(FileNotFoundError):
+        vid.get_frame(0)
+
+
+def test_images_video_moved_after_load(tmpdir):
+    original_dir = os.path.join(tmpdir, "original")
+    moved_dir = os.path.join(tmpdir, "moved")
+    os.makedirs(original_dir)
+    os.makedirs(moved_dir)
+    for i in range(3):
+        shutil.copy(f"tests/data/videos/robot{i}.jpg", original_dir)
+
+    vid = Video(
+        backend=SingleImageVideo(
+            filename=os.path.join(moved_dir, "robot0.jpg"),
+            filenames=[os.path.join(original_dir, f"robot{i}.jpg") for i in range(3)],
+        )
+    )
+
+    # The first image is loaded and its location cached.
+    assert vid.height == 320
+
+    # After it is moved, the stale location is dropped and the image is found again.
+    shutil.move(os.path.join(original_dir, "robot0.jpg"), moved_dir)
+    assert vid[0].shape == (1, 320, 560, 3)
+
+    # Files that exist but cannot be decoded are not reported as missing.
+    with open(os.path.join(original_dir, "robot1.jpg"), "w") as f:
+        f.write("not an image")
+    with pytest.raises(IOError) as excinfo:
+        vid.get_frame(1)
+    assert not isinstance(excinfo.value, FileNotFoundError)
+
+
 def test_imgstore_from_filenames(tmpdir):
     temp_filename = os.path.join(tmpdir, "test_imgstore")
     filenames = [f"tests/data/videos/robot{i}.jpg" for i in range(3)]
@@ -364,3 +428,18 @@ def test_safe_frame_loading(small_robot_mp4_vid):
 
     assert idxs == [1, 2]
     assert len(frames) == 2
+
+
+def test_fixup_path(tmpdir):
+    cwd = os.getcwd()
+    try:
+        os.chdir(tmpdir)
+        open("video.mp4", "w").close()
+
+        assert Video.fixup_path("video.mp4") == "video.mp4"
+        assert Video.fixup_path(os.path.join("missing", "video.mp4")) == "video.mp4"
+        assert Video.fixup_path("missing.mp4") == "missing.mp4"
+        with pytest.raises(FileNotFoundError):
+            Video.fixup_path("missing.mp4", raise_error=True)
+    finally:
+        os.chdir(cwd)
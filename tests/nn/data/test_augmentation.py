@@ -31,3 +31,171 @@ def test_augmentation(min_labels):
     assert example["instances"].dtype == tf.float32
     # TODO: check for correctness
     assert tf.reduce_all(example["instances"] != example_preaug["instances"])
+
+
+def test_tensorflow_augmenter(min_labels):
+    labels_reader = providers.LabelsReader.from_user_instances(min_labels)
+    ds = labels_reader.make_dataset()
+    example_preaug = next(iter(ds))
+
+    augmenter = augmentation.TensorFlowAugmenter.from_config(
+        augmentation.AugmentationConfig(
+            rotate=True, rotation_min_angle=-90, rotation_max_angle=-90
+        )
+    )
+    ds = augmenter.transform_dataset(ds)
+
+    example = next(iter(ds))
+
+    assert example["image"].shape == (384, 384, 1)
+    assert example["image"].dtype == tf.uint8
+
+    np.testing.assert_allclose(
+        tf.cast(tf.image.rot90(example_preaug["image"]), tf.float32),
+        tf.cast(example["image"], tf.float32),
+        atol=1,
+    )
+
+    assert example["instances"].shape == (2, 2, 2)
+    assert example["instances"].dtype == tf.float32
+
+    # Rotating by -90 degrees maps (x, y) -> (y, width - 1 - x).
+    pts_preaug = example_preaug["instances"].numpy()
+    np.testing.assert_allclose(
+        example["instances"].numpy(),
+        np.stack([pts_preaug[..., 1], 383 - pts_preaug[..., 0]], axis=-1),
+        atol=1e-3,
+    )
+
+
+def test_tensorflow_augmenter_noop(min_labels):
+    labels_reader = providers.LabelsReader.from_user_instances(min_labels)
+    ds = labels_reader.make_dataset()
+    augmenter = augmentation.TensorFlowAugmenter.from_config(
+        augmentation.AugmentationConfig()
+    )
+    assert augmenter.transform_dataset(ds) is ds
+
+
+def test_tensorflow_augmenter_translate_scale():
+    # Bright square centered on the point.
+    image = np.zeros((64, 64, 1), dtype="uint8")
+    image[29:32, 19:22] = 255
+    ds = tf.data.Dataset.from_tensors(
+        {"image": image, "instances": np.array([[[20.0, 30.0]]], dtype="float32")}
+    )
+
+    augmenter = augmentation.TensorFlowAugmenter.from_config(
+        augmentation.AugmentationConfig(
+            translate=True,
+            translate_min=5,
+            translate_max=5,
+            scale=True,
+            scale_min=1.5,
+            scale_max=1.5,
+        )
+    )
+    example = next(iter(augmenter.transform_dataset(ds)))
+
+    # Translating by (5, 5), then scaling about the center (31.5, 31.5).
+    expected_pt = 1.5 * (np.array([20.0, 30.0]) + 5 - 31.5) + 31.5
+    np.testing.assert_allclose(example["instances"][0, 0], expected_pt, atol=1e-3)
+
+    # The square should move with the point.
+    aug_image = example["image"].numpy()[..., 0].astype("float32")
+    yy, xx = np.mgrid[: aug_image.shape[0], : aug_image.shape[1]]
+    weights = aug_image / aug_image.sum()
+    centroid = np.array([(xx * weights).sum(), (yy * weights).sum()])
+    np.testing.assert_allclose(centroid, expected_pt, atol=0.5)
+    assert aug_image[37, 22] == 255
+
+
+def test_tensorflow_augmenter_matches_imgaug(min_labels):
+    labels_reader = providers.LabelsReader.from_user_instances(min_labels)
+    ds = labels_reader.make_dataset()
+
+    config = augmentation.AugmentationConfig(
+        rotate=True,
+        rotation_min_angle=30,
+        rotation_max_angle=30,
+        translate=True,
+        translate_min=7,
+        translate_max=7,
+        scale=True,
+        scale_min=1.2,
+        scale_max=1.2,
+    )
+    example_imgaug = next(
+        iter(augmentation.ImgaugAugmenter.from_config(config).transform_dataset(ds))
+    )
+    example_tf = next(
+        iter(augmentation.TensorFlowAugmenter.from_config(config).transform_dataset(ds))
+    )
+
+    np.testing.assert_allclose(
+        example_tf["instances"], example_imgaug["instances"], atol=1e-2
+    )
+
+
+def test_tensorflow_augmenter_noise_per_pixel():
+    ds = tf.data.Dataset.from_tensors(
+        {
+            "image": tf.fill([8, 8, 3], tf.constant(100, tf.uint8)),
+            "instances": tf.zeros([1, 1, 2], tf.float32),
+        }
+    )
+    augmenter = augmentation.TensorFlowAugmenter.from_config(
+        augmentation.AugmentationConfig(
+            uniform_noise=True,
+            uniform_noise_min_val=0.0,
+            uniform_noise_max_val=100.0,
+            gaussian_noise=True,
+        )
+    )
+    image = next(iter(augmenter.transform_dataset(ds)))["image"].numpy()
+
+    # The same noise value is added to all channels of a pixel.
+    np.testing.assert_array_equal(image[..., 1:], image[..., :1].repeat(2, axis=-1))
+
+
+def test_tensorflow_augmenter_intensity():
+    ds = tf.data.Dataset.from_tensors(
+        {
+            "image": tf.fill([4, 4, 1], tf.constant(100, tf.uint8)),
+            "instances": tf.zeros([1, 1, 2], tf.float32),
+        }
+    )
+
+    # Gamma is applied before brightness and the result is rounded:
+    # 255 * (100 / 255) ** 2 + 10.7 = 49.92
+    augmenter = augmentation.TensorFlowAugmenter.from_config(
+        augmentation.AugmentationConfig(
+            contrast=True,
+            contrast_min_gamma=2.0,
+            contrast_max_gamma=2.0,
+            brightness=True,
+            brightness_min_val=10.7,
+            brightness_max_val=10.7,
+        )
+    )
+    example = next(iter(augmenter.transform_dataset(ds)))
+    assert example["image"].dtype == tf.uint8
+    np.testing.assert_array_equal(example["image"], 50)
+
+    # Noise is clipped to the dtype range before the following adjustments:
+    # 100 + 200 -> 255 -> 255 ** 2 / 255 - 20.3 = 234.7
+    augmenter = augmentation.TensorFlowAugmenter.from_config(
+        augmentation.AugmentationConfig(
+            uniform_noise=True,
+            uniform_noise_min_val=200.0,
+            uniform_noise_max_val=200.0,
+            contrast=True,
+            contrast_min_gamma=2.0,
+            contrast_max_gamma=2.0,
+            brightness=True,
+            brightness_min_val=-20.3,
+            brightness_max_val=-20.3,
+        )
+    )
+    example = next(iter(augmenter.transform_dataset(ds)))
+    np.testing.assert_array_equal(example["image"], 235)
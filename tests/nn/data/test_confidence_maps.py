@@ -11,6 +11,7 @@ from sleap.nn.data.confidence_maps import (
     make_multi_confmaps,
     MultiConfidenceMapGenerator,
     InstanceConfidenceMapGenerator,
+    SingleInstanceConfidenceMapGenerator,
 )
 
 
@@ -93,6 +94,24 @@ def test_make_multi_confmaps():
         tf.reduce_max(tf.stack([cm0, cm1, cm2], axis=-1), axis=-1)
     )
 
+    # Leading dimensions are broadcast over.
+    cms_all = make_confmaps(instances, xv=xv, yv=yv, sigma=1.)
+    assert cms_all.shape == (3, 4, 5, 2)
+    np.testing.assert_array_equal(cms_all, tf.stack([cm0, cm1, cm2], axis=0))
+
+    # No instances
+    cms = make_multi_confmaps(
+        tf.zeros([0, 2, 2], tf.float32), xv=xv, yv=yv, sigma=1.)
+    assert cms.shape == (4, 5, 2)
+    assert (cms.numpy() == 0).all()
+
+    # Reduced precision
+    cms = make_multi_confmaps(instances, xv=xv, yv=yv, sigma=1.)
+    cms_bf16 = make_multi_confmaps(
+        instances, xv=xv, yv=yv, sigma=1., dtype=tf.bfloat16)
+    assert cms_bf16.dtype == tf.float32
+    np.testing.assert_allclose(cms_bf16, cms, atol=1e-2)
+
 
 def test_multi_confidence_map_generator(min_labels):
     labels_reader = providers.LabelsReader(min_labels)
@@ -124,6 +143,42 @@ def test_multi_confidence_map_generator(min_labels):
     )
 
 
+def test_multi_confidence_map_generator_jit_compile(min_labels):
+    labels_reader = providers.LabelsReader(min_labels)
+    ds = labels_reader.make_dataset()
+    ds_jit = MultiConfidenceMapGenerator(
+        sigma=3, output_stride=2, jit_compile=True
+    ).transform_dataset(ds)
+    ds = MultiConfidenceMapGenerator(sigma=3, output_stride=2).transform_dataset(ds)
+
+    np.testing.assert_allclose(
+        next(iter(ds_jit))["confidence_maps"],
+        next(iter(ds))["confidence_maps"],
+        atol=1e-6,
+    )
+
+
+def test_confidence_map_generators_dtype(min_labels):
+    labels_reader = providers.LabelsReader(min_labels)
+    ds = labels_reader.make_dataset()
+
+    for generator_cls in [
+        MultiConfidenceMapGenerator,
+        SingleInstanceConfidenceMapGenerator,
+    ]:
+        ds_bf16 = generator_cls(
+            sigma=3, output_stride=2, dtype=tf.bfloat16
+        ).transform_dataset(ds)
+        ds_fp32 = generator_cls(sigma=3, output_stride=2).transform_dataset(ds)
+
+        # Reduced precision is only used internally.
+        cms_bf16 = next(iter(ds_bf16))["confidence_maps"]
+        assert cms_bf16.dtype == tf.float32
+        np.testing.assert_allclose(
+            cms_bf16, next(iter(ds_fp32))["confidence_maps"], atol=1e-2
+        )
+
+
 def test_multi_confidence_map_generator_centroids(min_labels):
     labels_reader = providers.LabelsReader(min_labels)
     instance_centroid_finder = instance_centroids.InstanceCentroidFinder(
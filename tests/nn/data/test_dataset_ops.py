@@ -35,11 +35,74 @@ def test_batcher():
     assert examples_batched[0]["a"].shape == (2, 3, 2)
     assert np.isnan(examples_batched[0]["a"][0, 2, :]).all()
 
+    # Fixed size batch with scalars
+    ds = tf.data.Dataset.range(3)
+    ds = ds.map(lambda i: {"a": tf.ones([2, 2], tf.float32), "b": i})
+    ds_batched = dataset_ops.Batcher(batch_size=2).transform_dataset(ds)
+    examples_batched = list(iter(ds_batched))
+    assert len(examples_batched) == 2
+    assert examples_batched[0]["a"].shape == (2, 2, 2)
+    np.testing.assert_array_equal(examples_batched[0]["b"], [[0], [1]])
+    np.testing.assert_array_equal(examples_batched[1]["b"], [[2]])
+
+
+def test_cacher():
+    counter = tf.Variable(0)
+
+    def count(x):
+        counter.assign_add(1)
+        return {"a": x}
+
+    ds = tf.data.Dataset.range(3).map(count)
+    ds = dataset_ops.Cacher().transform_dataset(ds)
+
+    np.testing.assert_array_equal([ex["a"] for ex in ds], [0, 1, 2])
+    np.testing.assert_array_equal([ex["a"] for ex in ds], [0, 1, 2])
+    assert counter.numpy() == 3
+
 
 def test_preloader():
     preloader = dataset_ops.Preloader()
     ds = tf.data.Dataset.from_tensors({"a": tf.range(3)}).unbatch()
     ds = preloader.transform_dataset(ds)
 
-    np.testing.assert_array_equal(preloader.examples, [{"a": 0}, {"a": 1}, {"a": 2}])
+    # Examples are packed into the dataset rather than also kept on the transformer.
+    assert not hasattr(preloader, "examples")
     np.testing.assert_array_equal(list(iter(ds)), [{"a": 0}, {"a": 1}, {"a": 2}])
+
+
+def test_preloader_variable_length():
+    preloader = dataset_ops.Preloader()
+    ds = tf.data.Dataset.range(1, 4).map(lambda x: {"a": tf.range(x), "b": x})
+    ds = preloader.transform_dataset(ds)
+
+    assert not hasattr(preloader, "examples")
+    assert set(ds.element_spec.keys()) == {"a", "b"}
+
+    examples = list(iter(ds))
+    assert len(examples) == 3
+    for i, example in enumerate(examples):
+        assert set(example.keys()) == {"a", "b"}
+        np.testing.assert_array_equal(example["a"], np.arange(i + 1))
+        assert example["b"] == i + 1
+
+    preloader = dataset_ops.Preloader()
+    ds = tf.data.Dataset.range(1, 4).map(
+        lambda x: {"instances": tf.fill([x, 3, 2], x)}
+    )
+    ds = preloader.transform_dataset(ds)
+    assert ds.element_spec["instances"].shape.as_list() == [None, 3, 2]
+
+    for i, example in enumerate(ds):
+        assert example["instances"].shape == (i + 1, 3, 2)
+        assert (example["instances"].numpy() == i + 1).all()
+
+
+def test_make_dataset_options():
+    ds = tf.data.Dataset.range(4).map(lambda x: x + 1).batch(2)
+    ds = ds.with_options(dataset_ops.make_dataset_options())
+    assert ds.options().experimental_optimization.map_fusion
+    assert ds.options().experimental_threading.private_threadpool_size > 0
+    np.testing.assert_array_equal(
+        np.concatenate([x.numpy() for x in ds]), [1, 2, 3, 4]
+    )
@@ -34,6 +34,12 @@ def test_distance_to_edge():
     )
 
 
+def test_make_unit_vectors():
+    vectors = tf.cast([[3, 4], [0, 0], [np.nan, 1]], tf.float32)
+    unit_vectors = edge_maps.make_unit_vectors(vectors)
+    np.testing.assert_allclose(unit_vectors, [[0.6, 0.8], [0, 0], [0, 0]], atol=1e-6)
+
+
 def test_edge_confidence_map():
     xv, yv = make_grid_vectors(image_height=3, image_width=3, output_stride=1)
     edge_source = tf.cast([[1, 0.5], [0, 0]], tf.float32)
@@ -23,6 +23,12 @@ def test_find_points_bbox_midpoint():
     mid_pt = instance_centroids.find_points_bbox_midpoint(pts)
     np.testing.assert_array_equal(mid_pt, [1.5, 2.5])
 
+    pts = tf.convert_to_tensor([
+        [[np.nan, np.nan], [1, 2], [2, 3]],
+        [[np.nan, np.nan], [np.nan, np.nan], [np.nan, np.nan]]], dtype=tf.float32)
+    mid_pt = instance_centroids.find_points_bbox_midpoint(pts)
+    np.testing.assert_array_equal(mid_pt, [[1.5, 2.5], [np.nan, np.nan]])
+
 
 def test_get_instance_anchors():
     instances = tf.convert_to_tensor([
@@ -50,6 +50,22 @@ def test_crop_bboxes():
     np.testing.assert_array_equal(crops, np.expand_dims(img.numpy()[:3, :3, :], axis=0))
     assert crops.dtype == img.dtype
 
+
+def test_crop_bboxes_out_of_bounds():
+    img = tf.reshape(tf.range(1, 21, dtype=tf.float32), [5, 4, 1])
+
+    # Integer aligned (gathered) and subpixel (interpolated) boxes over the corner.
+    for offset in [0.0, 1e-3]:
+        bboxes = instance_cropping.make_centered_bboxes(
+            tf.cast([[offset, offset]], tf.float32), box_height=3, box_width=3)
+        crops = instance_cropping.crop_bboxes(img, bboxes)
+        assert crops.shape == (1, 3, 3, 1)
+        np.testing.assert_allclose(crops[0, :, :, 0], [
+            [0, 0, 0],
+            [0, 1, 2],
+            [0, 5, 6]], atol=1e-2)
+
+
 def test_crop_bboxes_rounding():
     # Test for rounding truncation bug when computing bounding box size for cropping.
     bboxes = instance_cropping.make_centered_bboxes(
@@ -91,6 +91,29 @@ def test_scale_image_range():
     )
 
 
+def test_scale_to_imagenet_caffe_mode():
+    mean_bgr = np.array([103.939, 116.779, 123.68])
+    np.testing.assert_allclose(
+        normalization.scale_to_imagenet_caffe_mode(
+            tf.fill([2, 2, 1], tf.constant(255, tf.uint8))
+        ),
+        np.full([2, 2, 3], 255.0) - mean_bgr,
+        rtol=1e-5,
+    )
+    np.testing.assert_allclose(
+        normalization.scale_to_imagenet_caffe_mode(
+            tf.fill([2, 2, 1], tf.constant(65535, tf.uint16))
+        ),
+        np.full([2, 2, 3], 255.0) - mean_bgr,
+        rtol=1e-5,
+    )
+    np.testing.assert_allclose(
+        normalization.scale_to_imagenet_caffe_mode(tf.ones([2, 2, 1], tf.float32)),
+        np.full([2, 2, 3], 255.0) - mean_bgr,
+        rtol=1e-5,
+    )
+
+
 def test_normalizer(min_labels):
     tf.executing_eagerly()
 
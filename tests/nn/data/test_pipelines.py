@@ -44,3 +44,33 @@ def test_pipeline_concatenation():
     assert len(G.transformers) == 2
     assert isinstance(G.transformers[0], pipelines.InstanceCentroidFinder)
     assert isinstance(G.transformers[1], pipelines.InstanceCropper)
+
+
+def test_pipeline_dataset_options(min_labels):
+    labels_reader = pipelines.LabelsReader.from_user_instances(min_labels)
+
+    # Inference and other generic pipelines keep the default dataset options.
+    ds = pipelines.Pipeline(providers=labels_reader).make_dataset()
+    assert not ds.options().experimental_optimization.map_vectorization.enabled
+    assert not ds.options().experimental_threading.private_threadpool_size
+
+    # Training pipelines enable them, including after keys are remapped.
+    pipeline_builder = pipelines.SingleInstanceConfmapsPipeline(
+        data_config=pipelines.DataConfig(),
+        optimization_config=pipelines.OptimizationConfig(batch_size=1),
+        single_instance_confmap_head=pipelines.SingleInstanceConfmapsHead(
+            part_names=["A", "B"]
+        ),
+    )
+    pipeline = pipeline_builder.make_training_pipeline(labels_reader)
+    pipeline += pipelines.KeyMapper({"confidence_maps": "confidence_maps"})
+    assert pipeline.optimize_dataset
+    ds = pipeline.make_dataset()
+    assert ds.options().experimental_optimization.map_vectorization.enabled
+    assert ds.options().experimental_threading.private_threadpool_size > 0
+    assert next(iter(ds))[0]["confidence_maps"].shape[0] == 1
+
+    # Concatenation keeps the options enabled.
+    key_mapper = pipelines.KeyMapper({"confidence_maps": "confidence_maps"})
+    pipeline = pipeline_builder.make_training_pipeline(labels_reader) + key_mapper
+    assert pipeline.optimize_dataset
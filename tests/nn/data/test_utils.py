@@ -55,3 +55,17 @@ def test_gaussian_pdf():
     assert utils.gaussian_pdf(0, sigma=1) == 1.0
     assert utils.gaussian_pdf(1, sigma=1) == 0.6065306597126334
     assert utils.gaussian_pdf(1, sigma=2) == 0.8824969025845955
+
+
+def test_get_image_size():
+    ds = tf.data.Dataset.from_tensors({"image": tf.zeros([4, 3, 1], tf.uint8)})
+    assert utils.get_image_size(ds) == (4, 3)
+
+    # Falls back to drawing an example when the static shape is unknown.
+    ds = ds.map(
+        lambda ex: {
+            "img": tf.py_function(lambda x: x, [ex["image"]], tf.uint8)
+        }
+    )
+    assert ds.element_spec["img"].shape.rank is None
+    assert utils.get_image_size(ds, image_key="img") == (4, 3)
@@ -41,9 +41,102 @@ def test_attr_to_dtype():
     with pytest.raises(TypeError):
         attr_to_dtype(TestAttr2)
 
-    with pytest.raises(TypeError):
+    with pytest.raises(TypeError, match="has unsupported type"):
         attr_to_dtype(TestAttr3)
 
+    from sleap.util import _NPY_STR, _USE_NPYSTRINGS
+
+    if _USE_NPYSTRINGS:
+        assert dtype.fields["d"][0] == _NPY_STR
+    else:
+        assert h5.check_string_dtype(dtype.fields["d"][0]).length is None
+
+    # Repeated calls reuse the cached dtype.
+    assert attr_to_dtype(TestAttr) is dtype
+
+    # Fixed-length strings
+    dtype = attr_to_dtype(TestAttr, max_str_len={"d": 8})
+    assert dtype.fields["d"][0] == np.dtype("S8")
+    assert h5.check_string_dtype(dtype.fields["d"][0]).length == 8
+    assert attr_to_dtype(TestAttr) is not dtype
+
+
+def test_attrs_to_struct():
+    @attr.s(auto_attribs=True)
+    class Record:
+        a: int
+        b: float
+        c: bool
+
+    @attr.s(auto_attribs=True)
+    class NamedRecord:
+        a: int
+        name: str
+
+    records = attrs_to_struct([Record(1, 2.5, True), Record(3, 4.5, False)], Record)
+    assert records.dtype == attr_to_dtype(Record)
+    np.testing.assert_array_equal(records["a"], [1, 3])
+    np.testing.assert_array_equal(records["b"], [2.5, 4.5])
+    np.testing.assert_array_equal(records["c"], [True, False])
+
+    records = attrs_to_struct([NamedRecord(1, "x"), NamedRecord(2, "yz")], NamedRecord)
+    assert records.shape == (2,)
+    assert list(records["name"]) == ["x", "yz"]
+
+    assert attrs_to_struct([], Record).shape == (0,)
+
+    @attr.s(auto_attribs=True)
+    class SingleRecord:
+        a: int
+
+    records = attrs_to_struct([SingleRecord(1), SingleRecord(2)], SingleRecord)
+    np.testing.assert_array_equal(records["a"], [1, 2])
+
+    @attr.s(auto_attribs=True)
+    class EmptyRecord:
+        pass
+
+    records = attrs_to_struct([EmptyRecord(), EmptyRecord()], EmptyRecord)
+    assert records.shape == (2,)
+    assert records.dtype.names == ()
+
+    # Fixed-length strings are stored as UTF-8 and must fit in the maximum length.
+    records = attrs_to_struct(
+        [NamedRecord(1, "héllo"), NamedRecord(2, "x")], NamedRecord, {"name": 6}
+    )
+    assert records.dtype == attr_to_dtype(NamedRecord, {"name": 6})
+    assert records["name"][0].decode("utf-8") == "héllo"
+    assert records["name"][1] == b"x"
+
+    with pytest.raises(ValueError):
+        attrs_to_struct([NamedRecord(1, "héllo")], NamedRecord, {"name": 5})
+
+
+def test_attrs_to_struct_hdf5(tmpdir):
+    @attr.s(auto_attribs=True)
+    class NamedRecord:
+        a: int
+        name: str
+
+    objs = [NamedRecord(1, "x"), NamedRecord(2, "héllo")]
+    filename = os.path.join(tmpdir, "records.h5")
+    with h5.File(filename, "w") as f:
+        f.create_dataset("records", data=attrs_to_struct(objs, NamedRecord))
+        f.create_dataset(
+            "fixed_records", data=attrs_to_struct(objs, NamedRecord, {"name": 6})
+        )
+
+    with h5.File(filename, "r") as f:
+        records = f["records"][:]
+        fixed_records = f["fixed_records"][:]
+
+    np.testing.assert_array_equal(records["a"], [1, 2])
+    assert [
+        name.decode("utf-8") if isinstance(name, bytes) else name
+        for name in records["name"]
+    ] == ["x", "héllo"]
+    assert [name.decode("utf-8") for name in fixed_records["name"]] == ["x", "héllo"]
+
 
 def test_frame_list():
     assert frame_list("3-5") == [3, 4, 5]
@@ -146,3 +239,14 @@ def test_save_dict_to_hdf5(tmpdir):
         assert f["bar"][-1].decode() == "zop"
 
         assert f["cab"]["a"][()] == 2
+
+
+def test_usable_cpu_count():
+    assert usable_cpu_count() > 0
+    assert usable_cpu_count() == len(usable_cpu_set())
+    assert isinstance(usable_cpu_set(), frozenset)
+    assert usable_cpu_set() is usable_cpu_set()
+    usable_cpu_count.cache_clear()
+    assert usable_cpu_count() > 0
+    usable_cpu_set.cache_clear()
+    assert usable_cpu_count() > 0